@@ -1,26 +1,25 @@
 import streamlit as st
-import pandas as pd
-import zipfile
-import tempfile
-import os
-import hashlib
+import time
 from datetime import datetime
 
-from backend.html_to_csv import parse_google_pay_html_to_csv
-from backend.analysis import analyze_google_pay, analyze_bank
-from backend.gemini_helper import generate_gemini_summary
+# pandas and the heavy backend modules are imported after login (see below)
+from backend.metrics import RECORDER, span
+from backend.uploads import blob_path, hash_upload, store_upload
 from auth.db import (
-    create_users_table, create_upload_history_table,
-    save_upload_history, get_upload_history
+    init_db, save_upload_history, get_upload_history, get_cached_summary, save_cached_summary,
+    get_category_rules, save_category_rules, reset_category_rules, get_summary_cache_stats
 )
-from auth.auth import get_user, add_user, verify_password
+from auth.auth import AuthService, AuthBusyError
 
 st.set_page_config(page_title="Finance Tracker", layout="wide")
 st.title("💸 Personal Finance Tracker")
 
-# Initialize tables
-create_users_table()
-create_upload_history_table()
+# Initialize tables (schema migrations run once per process)
+init_db()
+
+@st.cache_resource
+def get_auth_service():
+    return AuthService()
 
 # ------------------ User Login / Signup ------------------
 if "logged_in" not in st.session_state:
@@ -34,8 +33,12 @@ if not st.session_state.logged_in:
 
     if auth_choice == "Login":
         if st.button("Login"):
-            user = get_user(email)
-            if user and verify_password(password, user[1]):
+            try:
+                logged_in = get_auth_service().login(email, password)
+            except AuthBusyError:
+                st.error("Too many login attempts right now, please try again.")
+                st.stop()
+            if logged_in:
                 st.session_state.logged_in = True
                 st.session_state.email = email
                 st.success(f"✅ Welcome, {email}!")
@@ -44,11 +47,15 @@ if not st.session_state.logged_in:
                 st.error("Invalid credentials!")
     elif auth_choice == "Sign Up":
         if st.button("Sign Up"):
-            if get_user(email):
-                st.error("Email already registered.")
-            else:
-                add_user(email, password)
+            try:
+                created = get_auth_service().signup(email, password)
+            except AuthBusyError:
+                st.error("Too many sign-ups right now, please try again.")
+                st.stop()
+            if created:
                 st.success("Account created! Please log in.")
+            else:
+                st.error("Email already registered.")
 
 else:
     st.markdown(f"✅ Logged in as **{st.session_state.email}**")
@@ -58,6 +65,16 @@ else:
         st.rerun()
 
 if st.session_state.logged_in:
+    # ⚡ Imported here so the login page stays light on cold start
+    import pandas as pd
+    from backend import (
+        parse_google_pay_html, parse_google_pay_zip, analyze_google_pay, analyze_bank, add_time_columns,
+        combine_date_time, TransactionCache, load_transaction_store, RollupIndex, PAGE_SIZE, TransactionIndex,
+        DEFAULT_CATEGORY_RULES, Categorizer, find_recurring, find_anomalies, IngestQueue, JOB_TIMEOUT, MasterTransactions,
+        read_transactions_csv, MODEL_NAME, PROMPT_VERSION, GeminiConfigError, generate_gemini_summary,
+        summarize_periods, summary_cache_key
+    )
+
     # ------------------------- Sidebar Guide --------------------------
     st.sidebar.header("📁 How to Get Your Google Pay ZIP")
     st.sidebar.markdown("""
@@ -69,195 +86,371 @@ if st.session_state.logged_in:
     6. Upload the ZIP file here
     """)
 
-    def get_file_md5(file_bytes):
-        md5 = hashlib.md5()
-        md5.update(file_bytes)
-        return md5.hexdigest()
+    show_debug = st.sidebar.checkbox("🛠️ Show debug panel", key="show_debug")
+    if show_debug:
+        # Process-wide: stays on for every session until unticked here
+        RECORDER.set_trace_memory(st.sidebar.checkbox("Trace memory (slower)", value=RECORDER.trace_memory))
+
+    @st.cache_resource
+    def get_transaction_cache():
+        return TransactionCache()
 
+    # Leading underscore: Streamlit keys these on file_hash, not the raw bytes/path
     @st.cache_data(show_spinner="🔄 Processing uploaded ZIP...")
-    def extract_gpay_html_from_zip(zip_bytes, file_hash):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            zip_path = os.path.join(tmpdir, "takeout.zip")
-            with open(zip_path, "wb") as f:
-                f.write(zip_bytes)
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(tmpdir)
-            gpay_html_path = None
-            for root, _, files in os.walk(tmpdir):
-                for file in files:
-                    if file.endswith(".html") and "My Activity" in root and "Google Pay" in root:
-                        gpay_html_path = os.path.join(root, file)
-                        break
-            if not gpay_html_path:
-                return None
-            temp_csv_path = os.path.join(tmpdir, "transactions.csv")
-            parse_google_pay_html_to_csv(gpay_html_path, temp_csv_path)
-            df = pd.read_csv(temp_csv_path)
-            return df
+    def extract_gpay_html_from_zip(_zip_bytes, file_hash):
+        with span('load.zip'):
+            return get_transaction_cache().get_or_parse(file_hash, lambda: parse_google_pay_zip(_zip_bytes))
 
     @st.cache_data(show_spinner="🔄 Parsing HTML...")
-    def parse_uploaded_html(file_bytes, file_hash):
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as tmp_file:
-            tmp_file.write(file_bytes)
-            temp_html_path = tmp_file.name
-        temp_csv_path = temp_html_path.replace(".html", ".csv")
-        parse_google_pay_html_to_csv(temp_html_path, temp_csv_path)
-        df = pd.read_csv(temp_csv_path)
-        return df
-
-    @st.cache_data(show_spinner=False)
-    def get_week_df(df, selected_date):
-        week_start = selected_date - pd.to_timedelta(selected_date.weekday(), unit='d')
+    def parse_uploaded_html(_file_bytes, file_hash):
+        with span('load.html'):
+            return get_transaction_cache().get_or_parse(file_hash, lambda: parse_google_pay_html(_file_bytes))
+
+    @st.cache_data(show_spinner="🔄 Reading CSV...")
+    def read_uploaded_csv(_source, file_hash):
+        with span('load.csv'):
+            return read_transactions_csv(_source)
+
+    # One read-only, memory-mapped frame per dataset, shared by every session
+    @st.cache_resource(show_spinner=False)
+    def get_transaction_store(file_hash, _df):
+        with span('enrich.store', rows=len(_df)):
+            return load_transaction_store(file_hash, _df)
+
+    @st.cache_resource
+    def get_ingest_queue():
+        return IngestQueue()
+
+    STAGE_LABELS = {'unzip': "📦 Opening archive", 'parse': "🔄 Parsing transactions", 'enrich': "🧮 Building indexes"}
+
+    def ensure_ingested(source, source_name, file_hash):
+        """Parse an uncached upload in the background job queue, showing stage progress.
+
+        A rerun while this waits simply re-attaches to the same job.
+        """
+        if get_transaction_cache().contains(file_hash):
+            return
+        path = source if isinstance(source, str) else blob_path(file_hash, source_name)
+        queue = get_ingest_queue()
+        job_id = queue.submit(st.session_state.email, file_hash, source_name, path)
+        bar = st.progress(0.0, text="⏳ Queued...")
+        deadline = time.monotonic() + JOB_TIMEOUT
+        while True:
+            if time.monotonic() > deadline:
+                bar.empty()
+                st.error("❌ Processing this file is taking too long. Please try again later.")
+                st.stop()
+            job = queue.status(job_id)
+            if job['status'] == 'done':
+                bar.empty()
+                return
+            if job['status'] == 'failed':
+                bar.empty()
+                st.error(f"❌ {job['error']}")
+                st.stop()
+            if job['stage']:
+                bar.progress(job['progress'], text=f"{STAGE_LABELS[job['stage']]}... {job['progress']:.0%}")
+            time.sleep(0.25)
+
+    def merge_upload(master, source, source_name, file_hash):
+        """Merge an activity upload into the user's history; returns ``(merged, added)``.
+
+        A first merge reuses the upload's queue-parsed, cached frame; later
+        ones only parse entries newer than the stored history.
+        """
+        is_zip = source_name.lower().endswith(".zip")
+
+        def parse(since):
+            if since is None:
+                ensure_ingested(source, source_name, file_hash)
+                if is_zip:
+                    return extract_gpay_html_from_zip(source, file_hash)
+                return parse_uploaded_html(source, file_hash)
+            if is_zip:
+                return parse_google_pay_zip(source, since=since)
+            return parse_google_pay_html(source, since=since)
+
+        result = master.ingest(parse)
+        if result is None:
+            st.error("❌ Google Pay 'My Activity.html' not found in ZIP.")
+            st.stop()
+        return result
+
+    # Keyed on the history's revision, so a new merge loads the new file
+    @st.cache_resource(show_spinner=False)
+    def get_merged_history(revision, _master):
+        return _master.load()
+
+    @st.cache_resource(show_spinner=False)
+    def get_rollup_index(file_hash, _df):
+        with span('enrich.rollup', rows=len(_df)):
+            return RollupIndex(_df)
+
+    @st.cache_resource(show_spinner="🔎 Indexing transactions...")
+    def get_transaction_index(file_hash, _df):
+        with span('enrich.search_index', rows=len(_df)):
+            return TransactionIndex(_df)
+
+    # One memo of resolved descriptions per rule set, shared across datasets
+    @st.cache_resource
+    def get_categorizer(rules):
+        return Categorizer(rules)
+
+    @st.cache_resource(show_spinner=False)
+    def get_categories(file_hash, rules, _df):
+        with span('enrich.categories', rows=len(_df)):
+            return get_categorizer(rules).categorize(_df['Description'])
+
+    @st.cache_resource(show_spinner="🔁 Looking for recurring payments...")
+    def get_insights(file_hash, rules, _df):
+        with span('enrich.insights', rows=len(_df)):
+            return find_recurring(_df), find_anomalies(_df)
+
+    def get_week_df(df, rollup, selected_date):
+        week_start = selected_date - pd.to_timedelta(selected_date.weekday(), unit='D')
         week_end = week_start + pd.Timedelta(days=6)
-        week_df = df[(df['Raw Timestamp'].dt.date >= week_start) & (df['Raw Timestamp'].dt.date <= week_end)]
+        week_df = df.iloc[rollup.rows_between(week_start, week_end + pd.Timedelta(days=1))]
         return week_df, week_start, week_end
 
-    @st.cache_data(show_spinner=False)
-    def get_month_df(df, month):
-        return df[df['Month'] == month]
-
-    @st.cache_data(show_spinner="🧠 Summarizing with Gemini...")
-    def cached_gemini_summary(key: str, filtered_df: pd.DataFrame):
-        return generate_gemini_summary(filtered_df)
+    def get_month_df(df, rollup, month):
+        month_start = pd.Timestamp(month)
+        return df.iloc[rollup.rows_between(month_start, month_start + pd.offsets.MonthBegin())]
+
+    def cached_gemini_summary(filtered_df: pd.DataFrame):
+        cache_key = summary_cache_key(filtered_df)
+        summary = get_cached_summary(cache_key)
+        if summary is None:
+            try:
+                with st.spinner("🧠 Summarizing with Gemini..."):
+                    summary = generate_gemini_summary(filtered_df)
+            except GeminiConfigError as e:
+                st.error(str(e))
+                return ""
+            save_cached_summary(cache_key, MODEL_NAME, PROMPT_VERSION, summary)
+        return summary
 
     # --------------- Select from Upload History -----------------
     st.subheader("📁 Use a Previously Uploaded File")
     history = get_upload_history(st.session_state.email)
     selected_df = None
+    source = None
 
     if history:
-        display_names = [f"{fname} — {time}" for fname, _, time in history]
+        display_names = [f"{fname} — {time}" for fname, _, time, _ in history]
         selection = st.selectbox("Pick a file", display_names)
         if st.button("Load Selected File"):
-            filepath = [row[1] for row in history if f"{row[0]} — {row[2]}" == selection][0]
-            with open(filepath, "rb") as f:
-                file_bytes = f.read()
-            file_hash = get_file_md5(file_bytes)
-            selected_df = extract_gpay_html_from_zip(file_bytes, file_hash)
+            source_name, source, _, file_hash = [row for row in history if f"{row[0]} — {row[2]}" == selection][0]
+            if not file_hash:
+                # Uploaded before content hashing; hash it to find cached results
+                with open(source, "rb") as f:
+                    file_hash = hash_upload(f.read())
+
+    master = MasterTransactions(st.session_state.email)
+    if source is None and st.button("📚 Load My Merged History"):
+        selected_df = master.load()
+        if selected_df is None:
+            st.info("No merged history yet. Upload a Takeout with merging enabled.")
+        else:
+            file_hash = f"history-{master.revision(selected_df)}"
+            mode = 'Google Pay'
 
     # --------------- Upload New File -----------------
     st.subheader("📤 Upload a New File")
     uploaded_file = st.file_uploader("Upload ZIP / HTML / CSV", type=['zip', 'csv', 'html', 'txt'])
-
-    if uploaded_file and selected_df is None:
-        file_bytes = uploaded_file.read()
-        file_hash = get_file_md5(file_bytes)
-        upload_dir = os.path.join("uploads", st.session_state.email)
-        os.makedirs(upload_dir, exist_ok=True)
-        save_path = os.path.join(upload_dir, uploaded_file.name)
-        with open(save_path, "wb") as f:
-            f.write(file_bytes)
-
-        save_upload_history(st.session_state.email, uploaded_file.name, save_path)
-
-        if uploaded_file.name.endswith(".zip"):
-            selected_df = extract_gpay_html_from_zip(file_bytes, file_hash)
+    merge_history = st.checkbox("➕ Merge into my full transaction history", key="merge_history")
+
+    if uploaded_file and source is None and selected_df is None:
+        file_bytes = uploaded_file.getvalue()
+        file_hash = hash_upload(file_bytes)
+        # Reruns keep the same upload around; only record it once
+        if st.session_state.get("saved_upload_hash") != file_hash:
+            save_path = store_upload(file_bytes, file_hash, uploaded_file.name)
+            save_upload_history(st.session_state.email, uploaded_file.name, save_path, file_hash)
+            st.session_state.saved_upload_hash = file_hash
+        source, source_name = file_bytes, uploaded_file.name
+
+    if source is not None:
+        # source is the uploaded bytes or the stored file's path
+        name = source_name.lower()
+        is_activity = name.endswith(".zip") or name.endswith('.html') or name.endswith('.txt')
+        if merge_history and is_activity:
+            merge_key = (st.session_state.email, file_hash)
+            # Reruns keep the same upload around; only merge it once
+            if st.session_state.get("merged_upload") != merge_key:
+                selected_df, added = merge_upload(master, source, source_name, file_hash)
+                st.session_state.merged_upload = merge_key
+                st.session_state.merged_revision = f"history-{master.revision(selected_df)}"
+                st.session_state.merged_added = added
+            file_hash = st.session_state.merged_revision
+            if selected_df is None:
+                selected_df = get_merged_history(file_hash, master)
+            st.info(f"➕ {st.session_state.merged_added} new transactions merged into your history.")
+            mode = 'Google Pay'
+        elif name.endswith(".zip"):
+            ensure_ingested(source, source_name, file_hash)
+            selected_df = extract_gpay_html_from_zip(source, file_hash)
             if selected_df is None:
                 st.error("❌ Google Pay 'My Activity.html' not found in ZIP.")
                 st.stop()
             mode = 'Google Pay'
-        elif uploaded_file.name.endswith('.html') or uploaded_file.name.endswith('.txt'):
-            selected_df = parse_uploaded_html(file_bytes, file_hash)
+        elif name.endswith('.html') or name.endswith('.txt'):
+            ensure_ingested(source, source_name, file_hash)
+            selected_df = parse_uploaded_html(source, file_hash)
             mode = 'Google Pay'
-        elif uploaded_file.name.endswith('.csv'):
-            selected_df = pd.read_csv(uploaded_file)
-            if 'Time' in selected_df.columns and 'Amount' in selected_df.columns:
-                mode = 'Google Pay'
-            elif 'Balance' in selected_df.columns and 'Debit' in selected_df.columns:
-                mode = 'Bank'
-            else:
+        elif name.endswith('.csv'):
+            mode, selected_df = read_uploaded_csv(source, file_hash)
+            if mode is None:
                 st.error("Unsupported CSV format.")
                 st.stop()
         else:
             st.error("Unsupported file type.")
             st.stop()
 
+    # -------------------- Bank Statement Dashboard ---------------------
+    if selected_df is not None and mode == 'Bank':
+        with span('bank.analyze', rows=len(selected_df)):
+            _, bank_df, bank_daily, bank_weekday = analyze_bank(selected_df.copy())
+        st.subheader("🏦 Bank Statement")
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("💸 Total Debit", f"₹ {bank_df['Debit'].sum():,.2f}")
+        col2.metric("💰 Total Credit", f"₹ {bank_df['Credit'].sum():,.2f}")
+        closing = bank_df['Balance'].dropna()
+        col3.metric("🏦 Closing Balance", f"₹ {closing.iloc[-1]:,.2f}" if len(closing) else "—")
+
+        st.markdown("#### Daily Debits")
+        st.line_chart(bank_daily.set_index('Date'))
+        st.markdown("#### Debits by Weekday")
+        st.bar_chart(bank_weekday.set_index('Weekday'))
+
+        search_text = st.text_input("🔍 Search Description", key="bank_search")
+        shown = bank_df
+        if search_text:
+            shown = shown[shown['Description'].str.contains(search_text, case=False, regex=False, na=False)]
+        st.dataframe(shown)
+
     # -------------------- Proceed with Dashboard ---------------------
-    if selected_df is not None:
-        df = selected_df
+    elif selected_df is not None:
+        # Derived columns go on a shallow copy so the shared store stays untouched
+        df = get_transaction_store(file_hash, selected_df).copy(deep=False)
 
-        if 'Type' in df.columns:
+        if 'Type' in df.columns and not isinstance(df['Type'].dtype, pd.CategoricalDtype):
             df['Type'] = df['Type'].astype(str).str.strip().str.capitalize()
 
-        if 'Time' in df.columns and 'Date' in df.columns:
-            df['Raw Timestamp'] = pd.to_datetime(df['Date'].astype(str) + ' ' + df['Time'], errors='coerce')
-            df['Hour'] = df['Raw Timestamp'].dt.hour.fillna(0).astype(int)
-            df['Weekday'] = df['Raw Timestamp'].dt.day_name()
-            df['Week'] = df['Raw Timestamp'].dt.to_period('W').apply(lambda r: r.start_time.date())
-            df['Month'] = df['Raw Timestamp'].dt.to_period('M').apply(lambda r: r.start_time.strftime('%Y-%m'))
-            df['AM/PM'] = df['Raw Timestamp'].dt.strftime('%p').fillna('')
+        if 'Raw Timestamp' in df.columns or ('Time' in df.columns and 'Date' in df.columns):
+            with span('enrich.time_columns', rows=len(df)):
+                if 'Raw Timestamp' not in df.columns:
+                    df['Raw Timestamp'] = combine_date_time(df['Date'], df['Time'])
+                add_time_columns(df, df['Raw Timestamp'])
         else:
             st.error("Required columns 'Date' and 'Time' not found.")
             st.stop()
 
-        tab1, tab2, tab3, tab4 = st.tabs([
+        saved_rules = get_category_rules(st.session_state.email)
+        # An empty saved list is honoured: everything is then 'Other'
+        rules = tuple(DEFAULT_CATEGORY_RULES) if saved_rules is None else tuple(map(tuple, saved_rules))
+        categories = get_categories(file_hash, rules, df)
+        df['Merchant'] = categories['Merchant'].values
+        df['Category'] = categories['Category'].values
+
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
             "🗕️ Daily View",
             "🏜️ Weekly View",
             "🗓️ Monthly View",
-            "📄 Transaction Table"
+            "📄 Transaction Table",
+            "🏷️ Categories",
+            "🔁 Recurring & Unusual"
         ])
 
+        rollup = get_rollup_index(file_hash, df)
         today = pd.Timestamp.today().date()
 
         # -------- Daily --------
         with tab1:
             st.subheader("🗕️ Daily Transactions")
             selected_day = st.date_input("Choose a day", value=today, max_value=today)
-            day_df = df[df['Raw Timestamp'].dt.date == selected_day]
+            with span('tab.daily') as record:
+                day_df = df.iloc[rollup.rows_between(selected_day, selected_day + pd.Timedelta(days=1))]
+                day_stats = rollup.day_metrics(selected_day)
+                record['rows'] = len(day_df)
             st.dataframe(day_df)
-            st.metric("💸 Total Sent", f"₹ {abs(day_df[day_df['Type']=='Sent']['Amount'].sum()):,.2f}")
-            st.metric("💰 Total Received", f"₹ {day_df[day_df['Type']=='Received']['Amount'].sum():,.2f}")
+            st.metric("💸 Total Sent", f"₹ {abs(day_stats['Sent']):,.2f}")
+            st.metric("💰 Total Received", f"₹ {day_stats['Received']:,.2f}")
 
         # -------- Weekly --------
         with tab2:
             st.subheader("🏜️ Weekly Transactions")
             selected_week_date = st.date_input("Choose a date", value=today, max_value=today, key="weekly")
-            week_df, week_start, week_end = get_week_df(df, selected_week_date)
+            with span('tab.weekly') as record:
+                week_df, week_start, week_end = get_week_df(df, rollup, selected_week_date)
+                week_stats = rollup.week_metrics(week_start)
+                record['rows'] = len(week_df)
 
             st.markdown(f"#### Week Range: {week_start} → {week_end}")
             st.dataframe(week_df)
-            st.metric("💸 Weekly Sent", f"₹ {abs(week_df[week_df['Type']=='Sent']['Amount'].sum()):,.2f}")
-            st.metric("💰 Weekly Received", f"₹ {week_df[week_df['Type']=='Received']['Amount'].sum():,.2f}")
+            st.metric("💸 Weekly Sent", f"₹ {abs(week_stats['Sent']):,.2f}")
+            st.metric("💰 Weekly Received", f"₹ {week_stats['Received']:,.2f}")
 
-            spending_week = week_df[week_df['Type'] == 'Sent']
-            num_days_week = spending_week['Raw Timestamp'].dt.date.nunique()
-            avg_daily_spent_week = spending_week['Amount'].sum() / num_days_week if num_days_week > 0 else 0
+            num_days_week = week_stats['Sent Days']
+            avg_daily_spent_week = week_stats['Sent'] / num_days_week if num_days_week > 0 else 0
             st.metric("📊 Avg Daily Spending (Sent)", f"₹ {avg_daily_spent_week:.2f}")
 
             if st.checkbox("Show Spending Only", key='spending_only_weekly'):
-               st.dataframe(spending_week)
+               st.dataframe(week_df[week_df['Type'] == 'Sent'])
 
             if not week_df.empty and st.button("🧠 Generate Weekly AI Summary"):
-               summary_key = f"week-{week_start}-{file_hash}"
-               st.markdown(cached_gemini_summary(summary_key, week_df))
+               st.markdown(cached_gemini_summary(week_df))
 
         # -------- Monthly --------
         with tab3:
             st.subheader("🗓️ Monthly Transactions")
-            all_months = sorted(df['Month'].dropna().unique(), reverse=True)
+            all_months = rollup.months()
             selected_month = st.selectbox("Choose a month", all_months, index=0)
-            month_df = get_month_df(df, selected_month)
+            with span('tab.monthly') as record:
+                month_df = get_month_df(df, rollup, selected_month)
+                month_stats = rollup.month_metrics(selected_month)
+                record['rows'] = len(month_df)
 
             st.dataframe(month_df)
-            st.metric("💸 Monthly Sent", f"₹ {abs(month_df[month_df['Type']=='Sent']['Amount'].sum()):,.2f}")
-            st.metric("💰 Monthly Received", f"₹ {month_df[month_df['Type']=='Received']['Amount'].sum():,.2f}")
+            st.metric("💸 Monthly Sent", f"₹ {abs(month_stats['Sent']):,.2f}")
+            st.metric("💰 Monthly Received", f"₹ {month_stats['Received']:,.2f}")
 
-            spending_month = month_df[month_df['Type'] == 'Sent']
-            num_days_month = spending_month['Raw Timestamp'].dt.date.nunique()
-            avg_daily_spent_month = spending_month['Amount'].sum() / num_days_month if num_days_month > 0 else 0
+            num_days_month = month_stats['Sent Days']
+            avg_daily_spent_month = month_stats['Sent'] / num_days_month if num_days_month > 0 else 0
             st.metric("📊 Avg Daily Spending (Sent)", f"₹ {avg_daily_spent_month:.2f}")
 
             if st.checkbox("Show Spending Only", key='spending_only_monthly'):
-                st.dataframe(spending_month)
+                st.dataframe(month_df[month_df['Type'] == 'Sent'])
 
             if not month_df.empty and st.button("🧠 Generate Monthly AI Summary"):
-               summary_key = f"month-{selected_month}-{file_hash}"
-               st.markdown(cached_gemini_summary(summary_key, month_df))
+               st.markdown(cached_gemini_summary(month_df))
+
+            if st.button("🧠 Summarize All Months"):
+                month_keys = {month: summary_cache_key(group) for month, group in df.groupby('Month', observed=True)}
+                all_summaries = {month: get_cached_summary(key) for month, key in month_keys.items()}
+                missing = [month for month, summary in all_summaries.items() if summary is None]
+                if missing:
+                    try:
+                        with st.spinner("🧠 Summarizing every month with Gemini..."):
+                            fresh = summarize_periods(df[df['Month'].isin(missing)], 'Month')
+                    except GeminiConfigError as e:
+                        fresh = {month: e for month in missing}
+                    for month, summary in fresh.items():
+                        if not isinstance(summary, Exception):
+                            save_cached_summary(month_keys[month], MODEL_NAME, PROMPT_VERSION, summary)
+                    all_summaries.update(fresh)
+                for month, summary in sorted(all_summaries.items(), reverse=True):
+                    with st.expander(f"🗓️ {month}"):
+                        if isinstance(summary, Exception):
+                            st.error(f"Summary failed: {summary}")
+                        else:
+                            st.markdown(summary)
 
         # -------- All Transactions --------
-                # -------- All Transactions --------
         with tab4:
             st.subheader("📄 Full Transaction Table")
+            index = get_transaction_index(file_hash, df)
+            min_amount, max_amount = index.amount_bounds()
 
             col1, col2 = st.columns(2)
             with col1:
@@ -265,18 +458,96 @@ if st.session_state.logged_in:
             with col2:
                 amt_range = st.slider(
                     "💵 Amount Range",
-                    min_value=int(df['Amount'].min()),
-                    max_value=int(df['Amount'].max()),
-                    value=(int(df['Amount'].min()), int(df['Amount'].max()))
+                    min_value=int(min_amount),
+                    max_value=int(max_amount),
+                    value=(int(min_amount), int(max_amount))
                 )
 
-            filtered_df = df.copy()
-            if search_text:
-                filtered_df = filtered_df[filtered_df['Description'].str.contains(search_text, case=False, na=False)]
-
-            filtered_df = filtered_df[
-                (filtered_df['Amount'] >= amt_range[0]) &
-                (filtered_df['Amount'] <= amt_range[1])
-            ]
-
-            st.dataframe(filtered_df)
+            with span('tab.table') as record:
+                rows = index.search(search_text, amt_range)
+                record['rows'] = len(rows)
+            num_pages = max(1, -(-len(rows) // PAGE_SIZE))
+            page = st.number_input("Page", min_value=1, max_value=num_pages, value=1, step=1)
+            st.caption(f"{len(rows):,} matching transactions — page {page} of {num_pages}")
+            st.dataframe(df.iloc[index.page(rows, page)])
+
+        # -------- Categories --------
+        with tab5:
+            st.subheader("🏷️ Spending by Category")
+            with span('tab.categories', rows=len(df)):
+                sent_df = df[df['Type'] == 'Sent']
+                by_category = sent_df.groupby('Category', observed=True)['Amount'].sum().abs().sort_values(ascending=False)
+                by_merchant = (sent_df.groupby(['Merchant', 'Category'], observed=True)['Amount']
+                               .agg(Spent='sum', Transactions='count')
+                               .assign(Spent=lambda t: t['Spent'].abs())
+                               .sort_values('Spent', ascending=False)
+                               .head(20)
+                               .reset_index())
+            st.bar_chart(by_category)
+
+            st.markdown("#### Top Merchants")
+            st.dataframe(by_merchant)
+
+            with st.expander("✏️ Edit Category Rules"):
+                st.caption("The first keyword found as a whole word in the merchant name decides its category. "
+                           "End a keyword with * to match any word starting with it.")
+                edited = st.data_editor(pd.DataFrame(list(rules), columns=['Keyword', 'Category']),
+                                        num_rows="dynamic", key="category_rules")
+                if st.button("💾 Save Rules"):
+                    save_category_rules(st.session_state.email, [
+                        (str(keyword).strip(), str(category).strip())
+                        for keyword, category in edited.itertuples(index=False)
+                        if pd.notna(keyword) and pd.notna(category) and str(keyword).strip() and str(category).strip()
+                    ])
+                    st.rerun()
+                if saved_rules is not None and st.button("↩️ Reset to Defaults"):
+                    reset_category_rules(st.session_state.email)
+                    st.rerun()
+
+        # -------- Recurring & Unusual --------
+        with tab6:
+            recurring, anomalies = get_insights(file_hash, rules, df)
+            st.subheader("🔁 Recurring Payments")
+            if recurring.empty:
+                st.info("No recurring payments found.")
+            else:
+                active = recurring[recurring['Active']]
+                monthly_cost = (active['Typical Amount'] * 30.44 / active['Interval (days)']).sum()
+                st.metric("💳 Active Recurring (per month)", f"₹ {monthly_cost:,.2f}")
+                st.dataframe(recurring)
+
+            st.subheader("🚨 Unusual Spends")
+            st.caption("Payments far above the recent spending in their category.")
+            if anomalies.empty:
+                st.info("Nothing unusual found.")
+            else:
+                st.dataframe(anomalies)
+
+    # ------------------------- Debug Panel --------------------------
+    if show_debug:
+        st.divider()
+        st.subheader("🛠️ Stage Timings")
+        st.caption("Recent spans from every session in this server process.")
+        stages = pd.DataFrame.from_dict(RECORDER.summary(), orient='index')
+        if stages.empty:
+            st.info("No stages recorded yet.")
+        else:
+            stages['peak_mib'] = stages['peak_bytes'] / 2**20
+            st.dataframe(stages.drop(columns='peak_bytes').sort_values('seconds', ascending=False))
+            with st.expander("Recent spans"):
+                st.dataframe(pd.DataFrame(list(RECORDER.spans)).iloc[::-1])
+        col1, col2, col3 = st.columns(3)
+        col1.download_button("⬇️ JSON", RECORDER.to_json(), "stage_metrics.json", "application/json")
+        col2.download_button("⬇️ Prometheus", RECORDER.to_prometheus(), "stage_metrics.prom", "text/plain")
+        if col3.button("🧹 Clear"):
+            RECORDER.clear()
+            st.rerun()
+
+        st.subheader("🧠 Gemini Summary Cache")
+        stats = get_summary_cache_stats()
+        lookups = stats['hits'] + stats['misses']
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Hits", f"{stats['hits']:,}")
+        col2.metric("Misses", f"{stats['misses']:,}")
+        col3.metric("Hit Rate", f"{stats['hits'] / lookups:.0%}" if lookups else "—")
+        col4.metric("Cached Summaries", f"{stats['entries']:,}")
@@ -1,24 +1,94 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
-from .db import get_connection
+from .db import get_pool
+
+# bcrypt cost factor; raising it rehashes existing users on their next login
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+AUTH_WORKERS = int(os.environ.get("AUTH_WORKERS", os.cpu_count() or 2))
+AUTH_MAX_PENDING = int(os.environ.get("AUTH_MAX_PENDING", 32))
+
+
+class AuthBusyError(RuntimeError):
+    """Raised when too many hashing jobs are already queued."""
+
 
-def hash_password(password):
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+def hash_password(password, rounds=BCRYPT_ROUNDS):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
 
 def verify_password(password, hashed):
     return bcrypt.checkpw(password.encode(), hashed.encode())
 
+def hash_rounds(hashed):
+    # "$2b$12$..." -> 12
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
 def add_user(email, password):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO users (email, password) VALUES (?, ?)", 
-                   (email, hash_password(password)))
-    conn.commit()
-    conn.close()
+    hashed = hash_password(password)
+    with get_pool().connection() as conn:
+        conn.execute("INSERT INTO users (email, password) VALUES (?, ?)", (email, hashed))
 
 def get_user(email):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    data = cursor.fetchone()
-    conn.close()
-    return data
+    with get_pool().connection() as conn:
+        return conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
+
+def update_password_hash(email, hashed):
+    with get_pool().connection() as conn:
+        conn.execute("UPDATE users SET password = ? WHERE email = ?", (hashed, email))
+
+
+class AuthService:
+    """Runs bcrypt on a bounded thread pool instead of the script thread.
+
+    bcrypt releases the GIL, so threads hash in parallel. At most
+    ``max_workers`` hashes run at once and at most ``max_pending`` may be
+    queued; beyond that callers get ``AuthBusyError`` rather than piling
+    more work onto a saturated CPU.
+    """
+
+    def __init__(self, rounds=BCRYPT_ROUNDS, max_workers=AUTH_WORKERS, max_pending=AUTH_MAX_PENDING):
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise AuthBusyError("Too many authentication requests in progress")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash_password(self, password):
+        return self._run(hash_password, password, self.rounds)
+
+    def verify_password(self, password, hashed):
+        return self._run(verify_password, password, hashed)
+
+    def login(self, email, password):
+        user = get_user(email)
+        if not user or not self.verify_password(password, user[1]):
+            return False
+        if hash_rounds(user[1]) != self.rounds:
+            # Cost factor changed since this hash was made; upgrade it now
+            update_password_hash(email, self.hash_password(password))
+        return True
+
+    def signup(self, email, password):
+        if get_user(email):
+            return False
+        hashed = self.hash_password(password)
+        with get_pool().connection() as conn:
+            cursor = conn.execute("INSERT OR IGNORE INTO users (email, password) VALUES (?, ?)", (email, hashed))
+        return cursor.rowcount == 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
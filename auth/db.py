@@ -1,24 +1,25 @@
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
 
-def get_connection():
-    return sqlite3.connect("users.db", check_same_thread=False)
+DB_PATH = "users.db"
+POOL_SIZE = 8
+SUMMARY_TTL_SECONDS = 30 * 24 * 3600
+SUMMARY_MAX_ENTRIES = 1000
 
-def create_users_table():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
+# Applied in order, once per database; PRAGMA user_version records progress
+MIGRATIONS = [
+    [
+        """
         CREATE TABLE IF NOT EXISTS users (
             email TEXT PRIMARY KEY,
             password TEXT NOT NULL
         )
-    """)
-    conn.commit()
-    conn.close()
-
-def create_upload_history_table():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS upload_history (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             email TEXT NOT NULL,
@@ -26,25 +27,344 @@ def create_upload_history_table():
             filepath TEXT,
             upload_time TEXT
         )
-    """)
-    conn.commit()
-    conn.close()
-
-def save_upload_history(email, filename, filepath):
-    from datetime import datetime
-    conn = get_connection()
-    cursor = conn.cursor()
+        """,
+    ],
+    [
+        "CREATE INDEX IF NOT EXISTS idx_upload_history_email_time ON upload_history (email, upload_time)",
+    ],
+    [
+        """
+        CREATE TABLE IF NOT EXISTS summary_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            prompt_version INTEGER NOT NULL,
+            summary TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS summary_cache_stats (
+            counter TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+    ],
+    [
+        "ALTER TABLE upload_history ADD COLUMN content_hash TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_upload_history_email_hash ON upload_history (email, content_hash)",
+    ],
+    [
+        """
+        CREATE TABLE IF NOT EXISTS ingest_jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            filename TEXT,
+            filepath TEXT,
+            status TEXT NOT NULL,
+            stage TEXT,
+            progress REAL NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """,
+        # At most one queued/running job per content hash
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_ingest_jobs_active ON ingest_jobs (content_hash)
+        WHERE status IN ('queued', 'running')
+        """,
+    ],
+    [
+        """
+        CREATE TABLE IF NOT EXISTS category_rules (
+            email TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            keyword TEXT NOT NULL,
+            category TEXT NOT NULL,
+            PRIMARY KEY (email, position)
+        )
+        """,
+    ],
+    [
+        # Server process that queued the job, see backend.jobs.process_owner
+        "ALTER TABLE ingest_jobs ADD COLUMN owner TEXT",
+    ],
+    [
+        # Users who saved their own rules, even an empty list
+        "CREATE TABLE IF NOT EXISTS category_rule_owners (email TEXT PRIMARY KEY)",
+        "INSERT OR IGNORE INTO category_rule_owners SELECT DISTINCT email FROM category_rules",
+    ],
+]
+
+
+class ConnectionPool:
+    """A fixed-size pool of WAL-mode SQLite connections.
+
+    Connections are created lazily up to ``size`` and reused, so their
+    statement caches (sqlite3's prepared statements) survive across calls.
+    """
+
+    def __init__(self, path=DB_PATH, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success, rolls back on error."""
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_migrated = set()
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+def configure_pool(path=DB_PATH, size=POOL_SIZE):
+    """Point the module at a different database file (scripts, benchmarks)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(path, size)
+    return _pool
+
+def migrate(pool=None):
+    """Bring the schema up to date. Runs the DDL at most once per process.
+
+    Safe to run from several processes at once (see the loop below).
+    """
+    pool = pool or get_pool()
+    with _pool_lock:
+        if pool.path in _migrated:
+            return
+        with pool.connection() as conn:
+            # One write transaction per step: other processes migrating the same file
+            # wait here and then see the bumped version, and a crash mid-step leaves nothing
+            while True:
+                conn.execute("BEGIN IMMEDIATE")
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version >= len(MIGRATIONS):
+                    conn.rollback()
+                    break
+                for statement in MIGRATIONS[version]:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+                conn.commit()
+        _migrated.add(pool.path)
+
+def init_db():
+    migrate()
+
+def save_upload_history(email, filename, filepath, content_hash=None):
+    """Record an upload; re-uploading the same content only refreshes its row."""
     upload_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute("INSERT INTO upload_history (email, filename, filepath, upload_time) VALUES (?, ?, ?, ?)", 
-                   (email, filename, filepath, upload_time))
-    conn.commit()
-    conn.close()
+    with get_pool().connection() as conn:
+        if content_hash is not None:
+            cursor = conn.execute(
+                "UPDATE upload_history SET filename = ?, filepath = ?, upload_time = ? WHERE email = ? AND content_hash = ?",
+                (filename, filepath, upload_time, email, content_hash))
+            if cursor.rowcount:
+                return
+        conn.execute(
+            "INSERT INTO upload_history (email, filename, filepath, upload_time, content_hash) VALUES (?, ?, ?, ?, ?)",
+            (email, filename, filepath, upload_time, content_hash))
 
 def get_upload_history(email):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT filename, filepath, upload_time FROM upload_history WHERE email = ? ORDER BY upload_time DESC", 
-                   (email,))
-    data = cursor.fetchall()
-    conn.close()
-    return data
+    with get_pool().connection() as conn:
+        return conn.execute(
+            "SELECT filename, filepath, upload_time, content_hash FROM upload_history WHERE email = ? ORDER BY upload_time DESC",
+            (email,)).fetchall()
+
+def get_category_rules(email):
+    """The user's ``(keyword, category)`` rules in priority order, or None if they never saved any."""
+    with get_pool().connection() as conn:
+        if conn.execute("SELECT 1 FROM category_rule_owners WHERE email = ?", (email,)).fetchone() is None:
+            return None
+        return conn.execute(
+            "SELECT keyword, category FROM category_rules WHERE email = ? ORDER BY position",
+            (email,)).fetchall()
+
+def save_category_rules(email, rules):
+    with get_pool().connection() as conn:
+        conn.execute("INSERT OR IGNORE INTO category_rule_owners (email) VALUES (?)", (email,))
+        conn.execute("DELETE FROM category_rules WHERE email = ?", (email,))
+        conn.executemany(
+            "INSERT INTO category_rules (email, position, keyword, category) VALUES (?, ?, ?, ?)",
+            [(email, position, keyword, category) for position, (keyword, category) in enumerate(rules)])
+
+def reset_category_rules(email):
+    """Back to the default rules."""
+    with get_pool().connection() as conn:
+        conn.execute("DELETE FROM category_rules WHERE email = ?", (email,))
+        conn.execute("DELETE FROM category_rule_owners WHERE email = ?", (email,))
+
+def _bump_summary_counter(conn, counter):
+    conn.execute("INSERT OR IGNORE INTO summary_cache_stats (counter, value) VALUES (?, 0)", (counter,))
+    conn.execute("UPDATE summary_cache_stats SET value = value + 1 WHERE counter = ?", (counter,))
+
+def get_cached_summary(cache_key, ttl=SUMMARY_TTL_SECONDS):
+    now = time.time()
+    with get_pool().connection() as conn:
+        row = conn.execute("SELECT summary, created_at FROM summary_cache WHERE cache_key = ?",
+                           (cache_key,)).fetchone()
+        if row is not None and now - row[1] > ttl:
+            conn.execute("DELETE FROM summary_cache WHERE cache_key = ?", (cache_key,))
+            row = None
+        if row is None:
+            _bump_summary_counter(conn, 'misses')
+        else:
+            conn.execute("UPDATE summary_cache SET last_access = ? WHERE cache_key = ?", (now, cache_key))
+            _bump_summary_counter(conn, 'hits')
+    return row[0] if row else None
+
+def save_cached_summary(cache_key, model, prompt_version, summary, max_entries=SUMMARY_MAX_ENTRIES):
+    now = time.time()
+    with get_pool().connection() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO summary_cache (cache_key, model, prompt_version, summary, created_at, last_access)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (cache_key, model, prompt_version, summary, now, now))
+        # Keep only the most recently used entries
+        conn.execute("""
+            DELETE FROM summary_cache WHERE cache_key NOT IN (
+                SELECT cache_key FROM summary_cache ORDER BY last_access DESC LIMIT ?
+            )
+        """, (max_entries,))
+
+def get_summary_cache_stats():
+    with get_pool().connection() as conn:
+        stats = dict(conn.execute("SELECT counter, value FROM summary_cache_stats").fetchall())
+        entries = conn.execute("SELECT COUNT(*) FROM summary_cache").fetchone()[0]
+    return {'hits': stats.get('hits', 0), 'misses': stats.get('misses', 0), 'entries': entries}
+
+def create_ingest_job(email, content_hash, filename, filepath, owner=None):
+    """Queue a job for ``content_hash`` unless one is already queued or running.
+
+    Returns ``(job_id, created)``; ``created`` is False when the caller
+    attached to the existing job.
+    """
+    now = time.time()
+    with get_pool().connection() as conn:
+        cursor = conn.execute("""
+            INSERT OR IGNORE INTO ingest_jobs
+                (email, content_hash, filename, filepath, status, progress, created_at, updated_at, owner)
+            VALUES (?, ?, ?, ?, 'queued', 0, ?, ?, ?)
+        """, (email, content_hash, filename, filepath, now, now, owner))
+        if cursor.rowcount:
+            return cursor.lastrowid, True
+        row = conn.execute(
+            "SELECT job_id FROM ingest_jobs WHERE content_hash = ? AND status IN ('queued', 'running')",
+            (content_hash,)).fetchone()
+    if row is None:
+        # The other job finished in between; queue a fresh one
+        return create_ingest_job(email, content_hash, filename, filepath, owner)
+    return row[0], False
+
+def update_ingest_job(job_id, status=None, stage=None, progress=None, error=None):
+    with get_pool().connection() as conn:
+        conn.execute("""
+            UPDATE ingest_jobs SET status = COALESCE(?, status), stage = COALESCE(?, stage),
+                progress = COALESCE(?, progress), error = COALESCE(?, error), updated_at = ?
+            WHERE job_id = ?
+        """, (status, stage, progress, error, time.time(), job_id))
+
+def get_ingest_job(job_id):
+    with get_pool().connection() as conn:
+        row = conn.execute(
+            "SELECT job_id, content_hash, status, stage, progress, error FROM ingest_jobs WHERE job_id = ?",
+            (job_id,)).fetchone()
+    if row is None:
+        return None
+    return dict(zip(['job_id', 'content_hash', 'status', 'stage', 'progress', 'error'], row))
+
+def touch_ingest_jobs(job_ids):
+    """Heartbeat: refresh ``updated_at`` of the given jobs that are still queued/running."""
+    if not job_ids:
+        return
+    placeholders = ', '.join('?' * len(job_ids))
+    with get_pool().connection() as conn:
+        conn.execute(f"""
+            UPDATE ingest_jobs SET updated_at = ?
+            WHERE job_id IN ({placeholders}) AND status IN ('queued', 'running')
+        """, (time.time(), *job_ids))
+
+def fail_stale_ingest_jobs(max_age):
+    """Fail queued/running jobs not updated for ``max_age`` seconds (their owner stopped heartbeating)."""
+    with get_pool().connection() as conn:
+        conn.execute("""
+            UPDATE ingest_jobs SET status = 'failed', error = 'Stalled: no progress from its server', updated_at = ?
+            WHERE status IN ('queued', 'running') AND updated_at < ?
+        """, (time.time(), time.time() - max_age))
+
+def fail_interrupted_ingest_jobs(owner_alive):
+    """Mark queued/running jobs whose owner process is gone as failed.
+
+    ``owner_alive(owner)`` decides for each distinct owner; jobs without
+    one (queued before owners were recorded) count as interrupted.
+    """
+    with get_pool().connection() as conn:
+        owners = [row[0] for row in conn.execute(
+            "SELECT DISTINCT owner FROM ingest_jobs WHERE status IN ('queued', 'running')")]
+        for owner in owners:
+            if owner is not None and owner_alive(owner):
+                continue
+            conn.execute("""
+                UPDATE ingest_jobs SET status = 'failed', error = 'Interrupted', updated_at = ?
+                WHERE status IN ('queued', 'running') AND owner IS ?
+            """, (time.time(), owner))
@@ -0,0 +1,51 @@
+"""Lazy facade over the backend modules.
+
+``backend.parse_google_pay_html`` and friends import their module (and
+pandas, bs4, pyarrow, ...) the first time they are looked up, so the login
+page never pays for them. ``metrics`` and ``uploads`` are stdlib-only and
+can be imported directly.
+"""
+import importlib
+
+_EXPORTS = {
+    'parse_google_pay_html': 'html_to_csv',
+    'parse_google_pay_zip': 'html_to_csv',
+    'analyze_google_pay': 'analysis',
+    'analyze_bank': 'analysis',
+    'add_time_columns': 'analysis',
+    'combine_date_time': 'analysis',
+    'TransactionCache': 'cache',
+    'load_transaction_store': 'store',
+    'RollupIndex': 'rollup',
+    'PAGE_SIZE': 'search',
+    'TransactionIndex': 'search',
+    'DEFAULT_CATEGORY_RULES': 'categorize',
+    'Categorizer': 'categorize',
+    'find_recurring': 'insights',
+    'find_anomalies': 'insights',
+    'IngestQueue': 'jobs',
+    'JOB_TIMEOUT': 'jobs',
+    'MasterTransactions': 'merge',
+    'read_transactions_csv': 'csv_ingest',
+    'MODEL_NAME': 'gemini_helper',
+    'PROMPT_VERSION': 'gemini_helper',
+    'GeminiConfigError': 'gemini_helper',
+    'generate_gemini_summary': 'gemini_helper',
+    'summarize_periods': 'gemini_helper',
+    'summary_cache_key': 'gemini_helper',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    # Cache it so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -1,11 +1,53 @@
+import numpy as np
 import pandas as pd
 
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Date/Time as written by backend.html_to_csv
+DATE_TIME_FORMAT = '%Y-%m-%d %I:%M:%S %p'
+
+def combine_date_time(date, time):
+    combined = date.astype(str) + ' ' + time.astype(str)
+    ts = pd.to_datetime(combined, format=DATE_TIME_FORMAT, errors='coerce')
+    # Other CSV exports use other layouts; parse just those rows leniently
+    misses = ts.isna() & date.notna() & time.notna()
+    if misses.any():
+        ts[misses] = pd.to_datetime(combined[misses], format='mixed', errors='coerce')
+    return ts
+
+def add_time_columns(df, timestamp):
+    """Add Hour, Weekday, Week, Month and AM/PM derived from ``timestamp``.
+
+    Everything is integer arithmetic on datetime64 values: Week is the
+    Monday the week starts on (datetime64), Weekday, Month ('YYYY-MM') and
+    AM/PM are categoricals. Missing timestamps give Hour 0 and missing
+    labels.
+    """
+    values = pd.to_datetime(timestamp, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    valid = ~np.isnat(values)
+    days = values.astype('datetime64[D]')
+    # datetime64[D] counts from 1970-01-01, a Thursday
+    weekday = np.where(valid, (days.astype('int64') + 3) % 7, -1)
+    hour = np.where(valid, (values - days).astype('timedelta64[h]').astype('int64'), 0)
+
+    months = values.astype('datetime64[M]')
+    month_labels, month_codes = np.unique(months[valid], return_inverse=True)
+    codes = np.full(len(values), -1, dtype='int64')
+    codes[valid] = month_codes
+
+    df['Hour'] = hour
+    df['Weekday'] = pd.Categorical.from_codes(weekday, categories=WEEKDAYS)
+    df['Week'] = np.where(valid, days - np.maximum(weekday, 0).astype('timedelta64[D]'),
+                          np.datetime64('NaT', 'D')).astype('datetime64[ns]')
+    df['Month'] = pd.Categorical.from_codes(codes, categories=np.datetime_as_string(month_labels, unit='M'))
+    df['AM/PM'] = pd.Categorical.from_codes(np.where(valid, hour >= 12, -1), categories=['AM', 'PM'])
+    return df
+
 def clean_google_pay(df):
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-    df['Hour'] = pd.to_datetime(df['Time'], errors='coerce').dt.hour
-    df['Weekday'] = df['Date'].dt.day_name()
-    df['Week'] = df['Date'].dt.to_period('W').apply(lambda r: r.start_time.strftime('%Y-%m-%d'))
-    df['Month'] = df['Date'].dt.to_period('M').astype(str)
+    if 'Raw Timestamp' not in df.columns:
+        df['Raw Timestamp'] = combine_date_time(df['Date'], df['Time'])
+    df['Date'] = df['Raw Timestamp'].dt.normalize()
+    add_time_columns(df, df['Raw Timestamp'])
     df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce').fillna(0)
 
     # ✅ Add this to clean 'Type'
@@ -17,23 +59,23 @@ def clean_google_pay(df):
 
 def clean_bank(df):
     df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-    df['Weekday'] = df['Date'].dt.day_name()
+    df['Weekday'] = pd.Categorical(df['Date'].dt.day_name(), categories=WEEKDAYS)
     df['Debit'] = pd.to_numeric(df['Debit'], errors='coerce').fillna(0)
     df['Credit'] = pd.to_numeric(df['Credit'], errors='coerce').fillna(0)
-    df['Balance'] = pd.to_numeric(df['Balance'], errors='coerce').fillna(method='ffill')
+    df['Balance'] = pd.to_numeric(df['Balance'], errors='coerce').ffill()
     return df
 
 def analyze_google_pay(df):
     df = clean_google_pay(df)
     daily = df.groupby('Date')['Amount'].sum().reset_index()
     time_day = df.groupby('Hour')['Amount'].sum().reset_index()
-    weekday = df.groupby('Weekday')['Amount'].sum().reset_index()
+    weekday = df.groupby('Weekday', observed=True)['Amount'].sum().reset_index()
     return 'Google Pay', df, daily, time_day, weekday
 
 def analyze_bank(df):
     df = clean_bank(df)
     daily = df.groupby('Date')['Debit'].sum().reset_index()
-    weekday = df.groupby('Weekday')['Debit'].sum().reset_index()
+    weekday = df.groupby('Weekday', observed=False)['Debit'].sum().reset_index()
     return 'Bank', df, daily, weekday
 def generate_summary(df):
     if 'Type' not in df.columns or 'Amount' not in df.columns:
@@ -43,14 +85,19 @@ def generate_summary(df):
             'Month': pd.DataFrame(columns=['Month', 'Sent', 'Received']),
         }
 
-    df['Date'] = pd.to_datetime(df['Date'])
-    df['Week'] = df['Date'].dt.to_period('W').apply(lambda r: r.start_time.strftime('%Y-%m-%d'))
-    df['Month'] = df['Date'].dt.to_period('M').astype(str)
+    if 'Raw Timestamp' in df.columns:
+        df['Date'] = df['Raw Timestamp'].dt.normalize()
+    else:
+        df['Date'] = pd.to_datetime(df['Date'])
+    # Only Week and Month: Hour/Weekday/AM-PM from a midnight Date would clobber the caller's
+    periods = add_time_columns(pd.DataFrame(index=df.index), df['Date'])
+    df['Week'] = periods['Week']
+    df['Month'] = periods['Month']
 
     summary = {}
 
     for level in ['Date', 'Week', 'Month']:
-        grouped = df.groupby([level, 'Type'])['Amount'].sum().unstack(fill_value=0)
+        grouped = df.groupby([level, 'Type'], observed=True)['Amount'].sum().unstack(fill_value=0)
         grouped.columns.name = None
         grouped.reset_index(inplace=True)
         summary[level] = grouped
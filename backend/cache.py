@@ -0,0 +1,140 @@
+import os
+import shutil
+import sqlite3
+import time
+
+import pandas as pd
+
+CACHE_DIR = os.path.join("cache", "transactions")
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Bump when the parser output changes so stale entries are never served
+CACHE_VERSION = 1
+
+
+class TransactionCache:
+    """Disk cache of parsed transactions, keyed by the upload's content hash.
+
+    Each entry is a Parquet file under ``root``; ``index.db`` records its
+    size and last access so the least recently used entries are evicted
+    once the cache grows past ``max_bytes``. Other derived data (the
+    columnar stores) can share the budget through ``track``.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self.index_path = os.path.join(root, "index.db")
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, check_same_thread=False, timeout=30)
+
+    def _key(self, file_hash):
+        return f"{file_hash}-v{CACHE_VERSION}"
+
+    def contains(self, file_hash):
+        conn = self._connect()
+        row = conn.execute("SELECT filename FROM entries WHERE key = ?", (self._key(file_hash),)).fetchone()
+        conn.close()
+        return row is not None and os.path.exists(os.path.join(self.root, row[0]))
+
+    def get(self, file_hash):
+        key = self._key(file_hash)
+        conn = self._connect()
+        row = conn.execute("SELECT filename FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            conn.close()
+            return None
+        path = os.path.join(self.root, row[0])
+        try:
+            df = pd.read_parquet(path)
+        except (OSError, ValueError):
+            # File went missing or is unreadable; drop the stale index row
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            conn.commit()
+            conn.close()
+            return None
+        conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        conn.commit()
+        conn.close()
+        return df
+
+    def put(self, file_hash, df):
+        key = self._key(file_hash)
+        filename = f"{key}.parquet"
+        path = os.path.join(self.root, filename)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, filename, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, filename, os.path.getsize(path), time.time()))
+        conn.commit()
+        self._evict(conn, keep=key)
+        conn.close()
+
+    def track(self, key, path):
+        """Count ``path`` (a file or directory) against the budget, or refresh its last access.
+
+        ``key`` must not look like a content hash, e.g. ``'store/<name>'``.
+        Evicting it deletes ``path``.
+        """
+        if os.path.isdir(path):
+            size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        else:
+            size = os.path.getsize(path)
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, filename, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, os.path.relpath(path, self.root), size, time.time()))
+        conn.commit()
+        self._evict(conn, keep=key)
+        conn.close()
+
+    def _evict(self, conn, keep):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, filename, size FROM entries WHERE key != ? ORDER BY last_access", (keep,)).fetchall()
+        for key, filename, size in rows:
+            if total <= self.max_bytes:
+                break
+            path = os.path.join(self.root, filename)
+            if os.path.isdir(path):
+                # Open memory maps of an evicted store stay valid until closed
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+        conn.commit()
+
+    def get_or_parse(self, file_hash, parse):
+        """Return the cached frame for ``file_hash``, calling ``parse()`` on a miss.
+
+        ``None`` results (nothing to parse) are not cached.
+        """
+        df = self.get(file_hash)
+        if df is not None:
+            return df
+        df = parse()
+        if df is not None:
+            self.put(file_hash, df)
+        return df
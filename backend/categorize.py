@@ -0,0 +1,97 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Tried in order; the first match gives the counterparty
+COUNTERPARTY_PATTERNS = [
+    re.compile(r'^Paid ₹[\d,.]+ to (.+?) using\b'),
+    re.compile(r'^Received ₹[\d,.]+ from (.+?)(?: using\b|$)'),
+    re.compile(r'^Paid to (.+)$'),  # backend.html_parser output
+    re.compile(r'(?:\bto|\bfrom) (.+?)(?: using\b|$)'),
+]
+OTHER = 'Other'
+
+# (keyword, category): the first keyword matching whole words of the merchant
+# name (or of the description when there is no merchant) decides the category;
+# a trailing * matches any word starting with the keyword
+DEFAULT_CATEGORY_RULES = [
+    ('swiggy', 'Food'), ('zomato', 'Food'), ('kitchen', 'Food'), ('restaurant', 'Food'),
+    ('cafe', 'Food'), ('hotel', 'Food'), ('bakery', 'Food'),
+    ('uber', 'Transport'), ('ola', 'Transport'), ('rapido', 'Transport'), ('metro', 'Transport'),
+    ('petrol', 'Transport'), ('fuel', 'Transport'), ('logistics', 'Transport'),
+    ('cinema', 'Entertainment'), ('pvr', 'Entertainment'), ('inox', 'Entertainment'),
+    ('netflix', 'Entertainment'),
+    ('mart', 'Groceries'), ('dmart', 'Groceries'), ('supermarket', 'Groceries'), ('bigbasket', 'Groceries'),
+    ('grocer*', 'Groceries'), ('store', 'Groceries'),
+    ('pharma*', 'Health'), ('medical', 'Health'), ('hospital', 'Health'), ('clinic', 'Health'),
+    ('airtel', 'Bills'), ('jio', 'Bills'), ('recharge', 'Bills'), ('electricity', 'Bills'),
+    ('amazon', 'Shopping'), ('flipkart', 'Shopping'), ('myntra', 'Shopping'),
+    ('received ₹', 'Income'), ('sent ₹', 'Transfers'),
+]
+
+
+def normalize_merchant(name):
+    """'HOT STONE  KITCHEN ' -> 'Hot Stone Kitchen'."""
+    name = ' '.join(name.split()).strip(' .,-')
+    return name.title() if name else None
+
+
+def extract_counterparty(description):
+    for pattern in COUNTERPARTY_PATTERNS:
+        match = pattern.search(description)
+        if match:
+            return normalize_merchant(match.group(1))
+    return None
+
+
+def keyword_pattern(keyword):
+    """Case-insensitive regex matching ``keyword`` as whole words ('ola' is not in 'Motorola')."""
+    prefix = keyword.endswith('*')
+    keyword = keyword.rstrip('*')
+    # Word boundaries only at word-character ends, so 'sent ₹' still matches 'Sent ₹50'
+    start = r'\b' if re.match(r'\w', keyword) else ''
+    end = r'\b' if not prefix and re.search(r'\w$', keyword) else ''
+    return re.compile(start + re.escape(keyword) + end, re.IGNORECASE)
+
+
+class Categorizer:
+    """Maps descriptions to a normalized merchant and a spending category.
+
+    ``rules`` is a list of ``(keyword, category)`` pairs, matched
+    case-insensitively against whole words, in order (``'grocer*'``
+    matches any word starting with ``grocer``). Results are
+    memoized per distinct description, and ``categorize`` resolves each
+    distinct value once, so cost tracks unique descriptions, not rows.
+    """
+
+    def __init__(self, rules=DEFAULT_CATEGORY_RULES):
+        rules = [(str(keyword).strip(), str(category).strip()) for keyword, category in rules
+                 if keyword and category]
+        self.rules = [(keyword_pattern(keyword), category) for keyword, category in rules]
+        self.categories = list(dict.fromkeys([category for _, category in self.rules] + [OTHER]))
+        self._memo = {}
+
+    def resolve(self, description):
+        """``(merchant, category)`` for one description; merchant may be None."""
+        result = self._memo.get(description)
+        if result is None:
+            merchant = extract_counterparty(description)
+            text = merchant or description
+            category = next((category for pattern, category in self.rules if pattern.search(text)), OTHER)
+            result = self._memo[description] = (merchant, category)
+        return result
+
+    def categorize(self, descriptions):
+        """Merchant and Category columns for ``descriptions``, as categoricals."""
+        codes, uniques = pd.factorize(pd.Series(descriptions).astype(object))
+        resolved = [self.resolve(str(description)) for description in uniques]
+        merchants = pd.Categorical([merchant for merchant, _ in resolved])
+        categories = pd.Categorical([category for _, category in resolved], categories=self.categories)
+
+        def expand(per_unique):
+            # Rows with a missing description (code -1) pick up the trailing -1
+            row_codes = np.append(per_unique.codes, -1)[codes]
+            return pd.Categorical.from_codes(row_codes, categories=per_unique.categories)
+
+        return pd.DataFrame({'Merchant': expand(merchants), 'Category': expand(categories)})
@@ -0,0 +1,107 @@
+import io
+import warnings
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+GOOGLE_PAY_DTYPES = {'Date': str, 'Time': str, 'Description': str, 'Amount': 'float64', 'Type': str}
+BANK_COLUMNS = ['Date', 'Description', 'Debit', 'Credit', 'Balance']
+BANK_NUMERIC = ['Debit', 'Credit', 'Balance']
+# Rows per chunk when streaming bank statements
+BANK_CHUNK_ROWS = 100_000
+
+
+def _csv_input(source):
+    # Uploaded bytes or a stored file's path
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def sniff_csv(source):
+    """Return 'Google Pay', 'Bank' or None from the CSV's header row alone."""
+    columns = set(pd.read_csv(_csv_input(source), nrows=0).columns)
+    if {'Time', 'Amount'} <= columns:
+        return 'Google Pay'
+    if {'Balance', 'Debit'} <= columns:
+        return 'Bank'
+    return None
+
+
+def read_google_pay_csv(source, engine='pyarrow'):
+    """Read a Google Pay CSV (as written by ``backend.html_to_csv``) with fixed dtypes.
+
+    Only the known columns are read. ``engine`` is passed to ``pd.read_csv``;
+    use ``'c'`` where pyarrow is unavailable.
+    """
+    # pyarrow only takes a list of usecols, so resolve it from the header
+    header = pd.read_csv(_csv_input(source), nrows=0).columns
+    usecols = [col for col in header if col in GOOGLE_PAY_DTYPES]
+    dtypes = {col: GOOGLE_PAY_DTYPES[col] for col in usecols}
+    try:
+        return pd.read_csv(_csv_input(source), usecols=usecols, dtype=dtypes, engine=engine)
+    except ValueError:
+        if dtypes.get('Amount') != 'float64':
+            raise
+    # Amount has non-numeric cells (e.g. thousands separators); read it as text and coerce
+    df = pd.read_csv(_csv_input(source), usecols=usecols, dtype={**dtypes, 'Amount': str}, engine=engine)
+    df['Amount'] = pd.to_numeric(df['Amount'].str.replace(',', ''), errors='coerce')
+    return df
+
+
+def _date_format(dates):
+    """One strptime format for a bank statement's dates, worked out from a sample.
+
+    Tries the month-first and day-first readings of the first date and keeps
+    whichever parses more of ``dates`` (month-first on a tie, as pandas
+    would guess). None when neither reading is recognisable.
+    """
+    sample = dates.dropna()
+    if sample.empty:
+        return None
+    with warnings.catch_warnings():
+        # guess_datetime_format warns when a date only reads day-first
+        warnings.simplefilter('ignore', UserWarning)
+        guesses = [guess_datetime_format(sample.iloc[0], dayfirst=dayfirst) for dayfirst in (False, True)]
+    candidates = [fmt for fmt in dict.fromkeys(guesses) if fmt]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda fmt: pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum())
+
+
+def read_bank_csv(source, chunksize=BANK_CHUNK_ROWS):
+    """Read a bank statement CSV in chunks, typing each chunk as it arrives.
+
+    Only Date/Description/Debit/Credit/Balance are kept (missing ones come
+    back empty). Dates are parsed and amounts (which may carry thousands
+    separators) become float64 per chunk, so the untyped text of at most
+    one chunk is held at a time. The date format is fixed from the first
+    chunk, so every chunk reads dates the same way.
+    """
+    frames = []
+    date_format = None
+    reader = pd.read_csv(_csv_input(source), usecols=lambda col: col in BANK_COLUMNS,
+                         dtype=str, chunksize=chunksize)
+    for chunk in reader:
+        if 'Date' in chunk.columns:
+            if not frames:
+                date_format = _date_format(chunk['Date']) or 'mixed'
+            chunk['Date'] = pd.to_datetime(chunk['Date'], format=date_format, errors='coerce')
+        for col in BANK_NUMERIC:
+            if col in chunk.columns:
+                chunk[col] = pd.to_numeric(chunk[col].str.replace(',', ''), errors='coerce')
+        frames.append(chunk)
+    df = pd.concat(frames, ignore_index=True).reindex(columns=BANK_COLUMNS)
+    # A missing Description would come back as all-NaN float; keep it text so .str works
+    df['Description'] = df['Description'].astype('string')
+    return df
+
+
+def read_transactions_csv(source):
+    """Sniff and read a CSV upload. Returns ``(mode, df)``; ``(None, None)`` if unrecognised."""
+    mode = sniff_csv(source)
+    if mode == 'Google Pay':
+        return mode, read_google_pay_csv(source)
+    if mode == 'Bank':
+        return mode, read_bank_csv(source)
+    return None, None
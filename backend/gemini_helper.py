@@ -1,38 +1,196 @@
-import streamlit as st
-import google.generativeai as genai
+import hashlib
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-# ✅ Secure API Key from .streamlit/secrets.toml
-genai.configure(api_key=st.secrets["api_keys"]["gemini_key"])
+from .analysis import combine_date_time
+
+MODEL_NAME = "models/gemini-2.0-flash"
+# Bump whenever the prompt layout changes
+PROMPT_VERSION = 2
+# Rough budget for the raw-transaction section (~4 characters per token)
+ROW_TOKEN_BUDGET = 6000
+CHARS_PER_TOKEN = 4
+TOP_COUNTERPARTIES = 5
+COUNTERPARTY_PATTERN = r'(?:\bto|\bfrom) (.+?)(?: using\b|$)'
+
+
+class GeminiConfigError(RuntimeError):
+    """The Gemini API key is not configured."""
+
+
+class GeminiClient:
+    """Thin wrapper around ``google.generativeai`` with a ``generate(prompt)`` method.
+
+    Any object with the same method (e.g. a local fake in tests) can be
+    passed wherever a client is accepted.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, api_key=None):
+        if api_key is None:
+            import streamlit as st
+            # ✅ Secure API Key from .streamlit/secrets.toml
+            try:
+                api_key = st.secrets["api_keys"]["gemini_key"]
+            except (KeyError, FileNotFoundError) as e:
+                raise GeminiConfigError("Gemini API key missing: set [api_keys] gemini_key in .streamlit/secrets.toml") from e
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self._model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        chat = self._model.start_chat()
+        return chat.send_message(prompt).text
+
+
+_default_client = None
+
+def get_default_client():
+    global _default_client
+    if _default_client is None:
+        _default_client = GeminiClient()
+    return _default_client
+
+
+def _timestamps(df):
+    if 'Raw Timestamp' in df.columns:
+        return pd.to_datetime(df['Raw Timestamp'], errors='coerce')
+    if 'Time' in df.columns:
+        return combine_date_time(df['Date'], df['Time'])
+    return pd.to_datetime(df['Date'], errors='coerce')
+
+
+def aggregate_transactions(df):
+    """Pre-compute the facts the prompt asks about, so the model doesn't have to."""
+    amount = pd.to_numeric(df['Amount'], errors='coerce').fillna(0)
+    tx_type = df['Type'].astype(str)
+    sent = tx_type == 'Sent'
+    hours = _timestamps(df).dt.hour
+
+    counterparty = df['Description'].astype(str).str.extract(COUNTERPARTY_PATTERN, expand=False).str.strip()
+    top = counterparty.value_counts().head(TOP_COUNTERPARTIES)
+    largest = amount.abs().idxmax() if len(df) else None
 
-def generate_gemini_summary(df):
-    # Prepare main content
-    prompt_data = df[['Date', 'Description', 'Amount', 'Type']].to_string(index=False)
+    return {
+        'count': len(df),
+        'total_sent': float(amount[sent].abs().sum()),
+        'total_received': float(amount[tx_type == 'Received'].sum()),
+        'largest': None if largest is None else (str(df.loc[largest, 'Description']), float(amount[largest])),
+        'top_counterparties': list(top.items()),
+        'hourly_sent': hours[sent].value_counts().sort_index().astype(int).to_dict(),
+    }
 
-    # 🕒 Extract top 2 spending hours
-    df['Hour'] = pd.to_datetime(df['Time'], errors='coerce').dt.hour
-    hour_counts = df[df['Type'] == 'Sent']['Hour'].value_counts().nlargest(2)
-    top_hours = ', '.join([f"{int(h)}:00" for h in hour_counts.index if pd.notnull(h)])
+
+def _transaction_lines(df, token_budget):
+    ts = _timestamps(df)
+    lines = (ts.dt.strftime('%Y-%m-%d %H:%M').fillna('') + ' | '
+             + df['Type'].astype(str) + ' | '
+             + pd.to_numeric(df['Amount'], errors='coerce').fillna(0).map('{:.2f}'.format) + ' | '
+             + df['Description'].astype(str))
+    # Largest transactions first until the budget runs out, then back in date order
+    size = pd.to_numeric(df['Amount'], errors='coerce').abs().fillna(0).to_numpy()
+    order = np.argsort(-size, kind='stable')
+    keep = np.cumsum(lines.str.len().to_numpy()[order] + 1) <= token_budget * CHARS_PER_TOKEN
+    kept = order[keep]
+    kept = kept[np.argsort(ts.to_numpy()[kept], kind='stable')]
+    return '\n    '.join(lines.iloc[kept]), len(lines) - len(kept)
+
+
+def build_summary_prompt(df, token_budget=ROW_TOKEN_BUDGET):
+    stats = aggregate_transactions(df)
+    rows, omitted = _transaction_lines(df, token_budget)
+
+    top_hours = sorted(stats['hourly_sent'].items(), key=lambda kv: -kv[1])[:2]
+    top_hours = ', '.join(f"{int(h)}:00" for h, _ in top_hours)
+    hourly = ', '.join(f"{int(h)}:00={n}" for h, n in stats['hourly_sent'].items())
+    counterparties = ', '.join(f"{name} ({n})" for name, n in stats['top_counterparties']) or 'n/a'
+    largest = f"₹{stats['largest'][1]:,.2f} — {stats['largest'][0]}" if stats['largest'] else 'n/a'
+    note = f"\n    ({omitted} smaller transactions omitted)" if omitted else ''
 
     # 🧠 Build prompt
-    prompt = f"""
+    return f"""
     You are a smart finance assistant.
-    Analyze the following transactions and summarize:
+    Summarize the user's transactions below. The totals are already computed:
+
+    - Transactions: {stats['count']}
+    - Total sent: ₹{stats['total_sent']:,.2f}
+    - Total received: ₹{stats['total_received']:,.2f}
+    - Largest transaction: {largest}
+    - Most frequent counterparties: {counterparties}
+    - Sent transactions per hour: {hourly or 'n/a'}
+
+    Describe spending trends, and mention which hours the user spends money
+    most often. Based on data: {top_hours}
+
+    Transactions (date | type | amount | description):
+    {rows}{note}
+    """
+
+
+def summary_cache_key(df, model_name=MODEL_NAME, prompt_version=PROMPT_VERSION):
+    """Cheap fingerprint of a period's rows plus the model and prompt version.
+
+    Rows are hashed column-wise with ``hash_pandas_object`` rather than
+    serialized, so this stays fast for large periods.
+    """
+    rows = pd.DataFrame({
+        'ts': _timestamps(df),
+        'amount': pd.to_numeric(df['Amount'], errors='coerce'),
+        'type': df['Type'],
+        'description': df['Description'],
+    })
+    digest = hashlib.sha256(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+    digest.update(f"|{model_name}|{prompt_version}".encode())
+    return digest.hexdigest()
+
+
+def transient_errors():
+    """Errors worth retrying: rate limits, an unavailable service, timeouts."""
+    from google.api_core import exceptions
+    return (exceptions.TooManyRequests, exceptions.ServiceUnavailable, exceptions.DeadlineExceeded,
+            ConnectionError, TimeoutError)
+
+
+def generate_gemini_summary(df, client=None, retries=3, backoff=1.0):
+    """Summarize ``df`` with the model, retrying only transient errors.
+
+    Anything else (a bad key, a blocked prompt, a bug) is raised at once.
+    """
+    client = client or get_default_client()
+    prompt = build_summary_prompt(df)
+    retryable = transient_errors()
+    for attempt in range(retries + 1):
+        try:
+            return client.generate(prompt)
+        except retryable:
+            if attempt == retries:
+                raise
+            # Exponential backoff with jitter before retrying
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
 
-    - Total money sent and received
-    - Largest transaction
-    - Most frequent sender/recipient
-    - Spending trends
 
-    Also mention:
-    - Which hours the user spends money most often. Based on data: {top_hours}
+def summarize_periods(df, period='Month', client=None, max_workers=4, retries=3, backoff=1.0):
+    """Summarize every week or month of ``df`` concurrently.
 
-    Transactions:
-    {prompt_data}
+    ``period`` is a column such as ``'Week'`` or ``'Month'`` (see
+    ``backend.analysis.add_time_columns``). At most ``max_workers``
+    requests are in flight; transient errors are retried with exponential backoff.
+    Returns ``{period_value: summary}``, with the exception instead of a
+    summary for periods that still failed.
     """
+    client = client or get_default_client()
+    groups = [(key, group) for key, group in df.groupby(period, observed=True, sort=True) if len(group)]
 
-    model = genai.GenerativeModel("models/gemini-2.0-flash")
-    chat = model.start_chat()
-    response = chat.send_message(prompt)
+    def run(group):
+        try:
+            return generate_gemini_summary(group, client=client, retries=retries, backoff=backoff)
+        except Exception as exc:
+            return exc
 
-    return response.text
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(run, [group for _, group in groups])
+        return dict(zip([key for key, _ in groups], results))
@@ -1,47 +1,43 @@
-import re
 import pandas as pd
-from datetime import datetime
 
-def parse_gpay_text_file(text):
-    entries = text.split("Google Pay")
-    data = []
-
-    for entry in entries:
-        if not entry.strip():
-            continue
-
-        # Default values
-        amount = None
-        description = "N/A"
-        txn_type = None
-
-        # Case 1: Paid to someone
-        match_paid = re.search(r'Paid ₹([\d,.]+) to (.+?) using', entry)
-        if match_paid:
-            amount = -float(match_paid.group(1).replace(",", ""))
-            description = f"Paid to {match_paid.group(2).strip()}"
-            txn_type = "Sent"
+PAID_PATTERN = r'Paid ₹([\d,.]+) to (.+?) using'
+SENT_PATTERN = r'Sent ₹([\d,.]+) using'
+DATE_PATTERN = r'([A-Za-z]+ \d{1,2}, \d{4}, \d{1,2}:\d{2}:\d{2})'
 
-        # Case 2: Sent (assume we received money)
-        match_sent = re.search(r'Sent ₹([\d,.]+) using', entry)
-        if match_sent:
-            amount = float(match_sent.group(1).replace(",", ""))
-            description = "Received money"
-            txn_type = "Received"
-
-        # Case 3: Extract Date & Time
-        date_match = re.search(r'([A-Za-z]+ \d{1,2}, \d{4}, \d{1,2}:\d{2}:\d{2})', entry)
-        if not date_match:
-            continue
-        date_str = date_match.group(1)
-        dt = datetime.strptime(date_str, '%b %d, %Y, %I:%M:%S')
-
-        data.append({
-            "Date": dt.strftime('%Y-%m-%d'),       # Clean date
-            "Time": dt.strftime('%H:%M'),           # Clean time
-            "Description": description,
-            "Amount": amount,
-            "Type": txn_type
-        })
-
-    return pd.DataFrame(data)
+def parse_gpay_text_file(text):
+    entries = pd.Series(text.split("Google Pay"), dtype=object)
+    entries = entries[entries.str.strip() != '']
+
+    # Case 3: Extract Date & Time (entries without one are dropped)
+    date_str = entries.str.extract(DATE_PATTERN, expand=False)
+    entries = entries[date_str.notna()]
+    if entries.empty:
+        return pd.DataFrame()
+    dt = pd.to_datetime(date_str[entries.index], format='%b %d, %Y, %I:%M:%S')
+
+    # Default values
+    amount = pd.Series(None, index=entries.index, dtype=object)
+    description = pd.Series("N/A", index=entries.index, dtype=object)
+    txn_type = pd.Series(None, index=entries.index, dtype=object)
+
+    # Case 1: Paid to someone
+    paid = entries.str.extract(PAID_PATTERN)
+    is_paid = paid[0].notna()
+    amount[is_paid] = -pd.to_numeric(paid.loc[is_paid, 0].str.replace(",", "", regex=False))
+    description[is_paid] = "Paid to " + paid.loc[is_paid, 1].str.strip()
+    txn_type[is_paid] = "Sent"
+
+    # Case 2: Sent (assume we received money) -- wins over Case 1
+    sent = entries.str.extract(SENT_PATTERN, expand=False)
+    is_sent = sent.notna()
+    amount[is_sent] = pd.to_numeric(sent[is_sent].str.replace(",", "", regex=False))
+    description[is_sent] = "Received money"
+    txn_type[is_sent] = "Received"
+
+    return pd.DataFrame({
+        "Date": dt.dt.strftime('%Y-%m-%d'),       # Clean date
+        "Time": dt.dt.strftime('%H:%M'),           # Clean time
+        "Description": description,
+        "Amount": pd.to_numeric(amount),
+        "Type": txn_type
+    }).reset_index(drop=True)
@@ -1,19 +1,126 @@
 from bs4 import BeautifulSoup
-import re
+from html.parser import HTMLParser
+from collections import deque
+from contextlib import contextmanager
+import io
+import itertools
+import os
+import posixpath
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from dateutil.parser import parse
 import pandas as pd
 
-def parse_google_pay_html_to_csv(html_file_path, csv_file_path):
-    with open(html_file_path, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f, 'html.parser')
+try:
+    from .metrics import span
+except ImportError:
+    # Run as a script: python backend/html_to_csv.py ...
+    from metrics import span
+
+DETAILS_CLASS = 'content-cell mdl-cell mdl-cell--12-col mdl-typography--caption'
+CHUNK_SIZE = 64 * 1024
+INCREMENTAL_BATCH = 256
+COLUMNS = ['Date', 'Time', 'Description', 'Amount', 'Type']
+TIMESTAMP_FORMAT = '%b %d, %Y, %I:%M:%S %p'
+AMOUNT_PATTERN = r'([-+]?\d*\.?\d+)'
+GRID_TAG = b'<div class="mdl-grid">'
+# Chunks per worker in parallel mode, so uneven chunks still balance out
+CHUNKS_PER_WORKER = 4
+
+
+@contextmanager
+def _open_html(source):
+    # Accepts a path, raw bytes, or an open text/binary file object
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield f
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.TextIOWrapper(io.BytesIO(source), encoding='utf-8')
+    elif isinstance(source, io.TextIOBase):
+        yield source
+    else:
+        wrapper = io.TextIOWrapper(source, encoding='utf-8')
+        try:
+            yield wrapper
+        finally:
+            wrapper.detach()
+
+
+def _split_cell_text(text):
+    # text is the first content-cell of a completed mdl-grid, joined by '\n'
+    datetime_line = None
+    description_line = None
+
+    lines = text.split('\n')
+    for line in lines:
+        if 'AM' in line or 'PM' in line:
+            datetime_line = line.strip()
+        else:
+            if description_line:
+                description_line += " " + line.strip()
+            else:
+                description_line = line.strip()
+
+    description = description_line if description_line else ''
+    return description, datetime_line or ''
+
+
+def _parse_timestamp_fallback(value):
+    try:
+        # Keep the printed wall-clock time, as for the usual GMT+05:30 stamps ('... PM UTC' would be tz-aware)
+        return parse(value).replace(tzinfo=None)
+    except Exception:
+        return pd.NaT
+
+
+def extract_transaction_fields(descriptions, raw_timestamps):
+    """Resolve Date/Time/Amount/Type for a batch of raw cell strings.
+
+    All fields are derived with vectorized string and datetime operations;
+    only timestamps that do not match the Takeout format fall back to
+    ``dateutil`` one at a time. Values are returned as strings, exactly as
+    they are written to CSV.
+    """
+    return _resolve_fields(descriptions, raw_timestamps)[0]
 
-    transactions = []
+
+def _resolve_fields(descriptions, raw_timestamps):
+    description = pd.Series(descriptions, dtype=object).fillna('').astype(str)
+    timestamp_clean = pd.Series(raw_timestamps, dtype=object, index=description.index)
+    timestamp_clean = timestamp_clean.fillna('').astype(str).str.split(' GMT', n=1).str[0]
+
+    dt = pd.to_datetime(timestamp_clean, format=TIMESTAMP_FORMAT, errors='coerce')
+    misses = dt.isna() & (timestamp_clean != '')
+    if misses.any():
+        dt[misses] = pd.to_datetime(timestamp_clean[misses].map(_parse_timestamp_fallback), errors='coerce')
+
+    date_str = dt.dt.strftime('%Y-%m-%d').fillna('')
+    time_str = dt.dt.strftime('%I:%M:%S %p').fillna('')
+
+    amount = description.str.replace(',', '', regex=False).str.extract(AMOUNT_PATTERN, expand=False).fillna('0')
+
+    # 'paid' means money went out; everything else ('sent' included) came in
+    tx_type = description.str.contains('paid', case=False, regex=False).map({True: 'Sent', False: 'Received'})
+
+    fields = pd.DataFrame({
+        'Date': date_str.astype(object),
+        'Time': time_str.astype(object),
+        'Description': description.astype(object),
+        'Amount': amount.astype(object),
+        'Type': tx_type.astype(object),
+    }, columns=COLUMNS)
+    return fields, dt
+
+
+def _iter_soup_transactions(source):
+    with _open_html(source) as f:
+        soup = BeautifulSoup(f, 'html.parser')
 
     transaction_divs = soup.find_all('div', class_='mdl-grid')
 
     for div in transaction_divs:
         # Check the specific 'details' div for 'Completed'
-        details_div = div.find('div', class_='content-cell mdl-cell mdl-cell--12-col mdl-typography--caption')
+        details_div = div.find('div', class_=DETAILS_CLASS)
         if not details_div or 'Completed' not in details_div.get_text():
             continue  # Skip incomplete transactions
 
@@ -22,68 +129,295 @@ def parse_google_pay_html_to_csv(html_file_path, csv_file_path):
         if not content_cells or len(content_cells) < 2:
             continue
 
-        desc_time_div = content_cells[0]
-        text = desc_time_div.get_text(separator='\n').strip()
+        text = content_cells[0].get_text(separator='\n').strip()
+        yield _split_cell_text(text)
 
-        datetime_line = None
-        description_line = None
 
-        lines = text.split('\n')
-        for line in lines:
-            if 'AM' in line or 'PM' in line:
-                datetime_line = line.strip()
-            else:
-                if description_line:
-                    description_line += " " + line.strip()
-                else:
-                    description_line = line.strip()
+class _GridCellParser(HTMLParser):
+    """Incremental parser that emits one completed mdl-grid cell at a time.
 
-        if not datetime_line:
-            datetime_line = ''
+    Only the state of the currently open grids is kept, so memory stays
+    bounded by the size of a single transaction rather than the file.
+    """
 
-        description = description_line if description_line else ''
-        raw_timestamp = datetime_line
-        timestamp_clean = raw_timestamp.split(' GMT')[0]
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.ready = deque()
+        self._divs = []     # role of every open div: 'grid', 'cell', 'details' or None
+        self._grids = []    # state of every open mdl-grid, innermost last
+        self._text = []     # pending text node, flushed on the next tag
 
-        try:
-            dt = parse(timestamp_clean)
-            date_str = dt.strftime('%Y-%m-%d')
-            time_str = dt.strftime('%I:%M:%S %p')
-        except Exception:
-            date_str = ''
-            time_str = ''
-
-        amount_match = re.search(r'[-+]?\d*\.?\d+', description.replace(',', ''))
-        amount = amount_match.group() if amount_match else '0'
-
-        # Updated Type detection logic
-        desc_lower = description.lower()
-        if 'paid' in desc_lower:
-            tx_type = 'Sent'
-        elif 'sent' in desc_lower:
-            tx_type = 'Received'
+    def _flush_text(self):
+        if not self._text:
+            return
+        data = ''.join(self._text)
+        self._text = []
+        if not self._grids:
+            return
+        grid = self._grids[-1]
+        if grid['in_cell']:
+            grid['cell_text'].append(data)
+        if grid['in_details']:
+            grid['details_text'].append(data)
+
+    def handle_data(self, data):
+        self._text.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag != 'div':
+            return
+        class_attr = dict(attrs).get('class') or ''
+        classes = class_attr.split()
+        grid = self._grids[-1] if self._grids else None
+
+        if 'mdl-grid' in classes:
+            if grid is not None:
+                grid['nested'] = True
+            self._grids.append({
+                'nested': False, 'cells': 0, 'in_cell': 0, 'cell_text': [],
+                'in_details': 0, 'details_seen': False, 'details_text': [],
+            })
+            self._divs.append('grid')
+        elif grid is not None and 'content-cell' in classes:
+            grid['cells'] += 1
+            role = None
+            if grid['cells'] == 1 or grid['in_cell']:
+                grid['in_cell'] += 1
+                role = 'cell'
+            if class_attr == DETAILS_CLASS and not grid['details_seen']:
+                grid['details_seen'] = True
+                grid['in_details'] += 1
+                role = 'details' if role is None else 'cell+details'
+            elif grid['in_details']:
+                grid['in_details'] += 1
+                role = 'details' if role is None else 'cell+details'
+            self._divs.append(role)
+        elif grid is not None and (grid['in_cell'] or grid['in_details']):
+            role = None
+            if grid['in_cell']:
+                grid['in_cell'] += 1
+                role = 'cell'
+            if grid['in_details']:
+                grid['in_details'] += 1
+                role = 'details' if role is None else 'cell+details'
+            self._divs.append(role)
         else:
-            tx_type = 'Received'  # fallback default
+            self._divs.append(None)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_text()
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag != 'div' or not self._divs:
+            return
+        role = self._divs.pop()
+        if role == 'grid':
+            self._close_grid(self._grids.pop())
+        elif role is not None:
+            grid = self._grids[-1]
+            if 'cell' in role:
+                grid['in_cell'] -= 1
+            if 'details' in role:
+                grid['in_details'] -= 1
 
-        transactions.append({
-            'Date': date_str,
-            'Time': time_str,
-            'Description': description,
-            'Amount': amount,
-            'Type': tx_type
-        })
+    def _close_grid(self, grid):
+        # An enclosing grid only repeats the first cell of its inner grids,
+        # which the soup engine then drops as a duplicate.
+        if grid['nested']:
+            return
+        if not grid['details_seen'] or 'Completed' not in ''.join(grid['details_text']):
+            return  # Skip incomplete transactions
+        if grid['cells'] < 2:
+            return
+        self.ready.append('\n'.join(grid['cell_text']).strip())
+
+
+def _iter_stream_transactions(source):
+    parser = _GridCellParser()
+    with _open_html(source) as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+            parser.feed(chunk)
+            while parser.ready:
+                yield _split_cell_text(parser.ready.popleft())
+    parser.close()
+    while parser.ready:
+        yield _split_cell_text(parser.ready.popleft())
+
+
+ENGINES = {
+    'soup': _iter_soup_transactions,
+    'stream': _iter_stream_transactions,
+}
+
+
+def iter_google_pay_cells(source, engine='stream'):
+    """Yield ``(description, raw_timestamp)`` for each completed mdl-grid cell.
+
+    ``source`` is a path, the raw HTML bytes, or an open file object.
+    ``engine='stream'`` reads it incrementally with ``HTMLParser``;
+    ``engine='soup'`` builds a full BeautifulSoup tree. Both produce the
+    same records once duplicates are dropped. Field extraction is left to
+    ``extract_transaction_fields`` so it runs once over the whole batch.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {sorted(ENGINES)}")
+    return ENGINES[engine](source)
+
+
+def _collect_since(cells, since):
+    # Activity files list newest first: resolve cells in batches and stop
+    # after the first batch whose dated entries all predate ``since``.
+    since = pd.Timestamp(since)
+    frames = []
+    batch = []
+    cells = iter(cells)
+    while True:
+        batch = list(itertools.islice(cells, INCREMENTAL_BATCH))
+        if not batch:
+            break
+        fields, dt = _resolve_fields([d for d, _ in batch], [t for _, t in batch])
+        frames.append(fields[(dt.isna() | (dt >= since)).to_numpy()])
+        dated = dt.dropna()
+        if len(dated) and (dated < since).all():
+            break
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _read_html_bytes(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    data = source.read()
+    return data.encode('utf-8') if isinstance(data, str) else data
+
+
+def _grid_boundaries(data, parts):
+    """Offsets cutting ``data`` into at most ``parts`` pieces, each after the first starting at an mdl-grid."""
+    step = len(data) // parts
+    bounds = [0]
+    for i in range(1, parts):
+        pos = data.find(GRID_TAG, max(i * step, bounds[-1] + 1))
+        if pos == -1:
+            break
+        bounds.append(pos)
+    bounds.append(len(data))
+    return bounds
+
+
+def _parse_chunk(chunk):
+    cells = list(_iter_stream_transactions(chunk))
+    return extract_transaction_fields([d for d, _ in cells], [t for _, t in cells])
+
+
+def _collect_parallel(source, workers):
+    # A chunk that starts at an mdl-grid parses exactly as it does in the
+    # whole file: the stream parser only emits innermost grids, and the
+    # enclosing page-level grid that a chunk loses is never emitted anyway.
+    data = _read_html_bytes(source)
+    bounds = _grid_boundaries(data, workers * CHUNKS_PER_WORKER)
+    chunks = [data[start:end] for start, end in zip(bounds, bounds[1:])]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(_parse_chunk, chunks))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _collect_transactions(source, engine, since=None, workers=1):
+    if workers > 1 and engine != 'stream':
+        raise ValueError("workers > 1 requires engine='stream'")
+    if since is None and workers > 1:
+        with span('parse.parallel') as record:
+            df_tx = _collect_parallel(source, workers)
+            record['rows'] = len(df_tx)
+    elif since is None:
+        with span(f'parse.cells.{engine}') as record:
+            cells = list(iter_google_pay_cells(source, engine=engine))
+            record['rows'] = len(cells)
+        with span('parse.fields', rows=len(cells)):
+            descriptions = [description for description, _ in cells]
+            raw_timestamps = [raw_timestamp for _, raw_timestamp in cells]
+            df_tx = extract_transaction_fields(descriptions, raw_timestamps)
+    else:
+        with span('parse.incremental') as record:
+            df_tx = _collect_since(iter_google_pay_cells(source, engine=engine), since)
+            record['rows'] = len(df_tx)
 
     # Remove duplicates based on key columns
-    df_tx = pd.DataFrame(transactions)
-    df_tx = df_tx.drop_duplicates(subset=['Date', 'Time', 'Amount', 'Description'])
+    with span('parse.dedupe', rows=len(df_tx)):
+        return df_tx.drop_duplicates(subset=['Date', 'Time', 'Amount', 'Description'])
+
+
+def parse_google_pay_html(source, engine='stream', since=None, workers=1):
+    """Parse a Google Pay activity file straight into a typed DataFrame.
+
+    Values match what ``pd.read_csv`` returned for the CSV written by
+    ``parse_google_pay_html_to_csv``: ``Amount`` is float64 and blank
+    strings are missing values. With ``since``, parsing stops once the
+    (newest-first) file reaches entries older than that timestamp, and
+    only entries at or after it are returned.
+
+    ``workers > 1`` (full parses only) splits the file at mdl-grid
+    boundaries and parses the pieces in a process pool; the result is
+    identical to the serial parse.
+    """
+    df_tx = _collect_transactions(source, engine, since=since, workers=workers).reset_index(drop=True)
+    df_tx['Amount'] = pd.to_numeric(df_tx['Amount'], errors='coerce').astype('float64')
+    for col in ['Date', 'Time', 'Description', 'Type']:
+        df_tx[col] = df_tx[col].mask(df_tx[col] == '')
+    return df_tx
+
+
+def find_google_pay_activity(zip_ref):
+    """Return the name of the Google Pay 'My Activity' HTML member, or None.
+
+    Only the archive's central directory is read; nothing is extracted.
+    """
+    for info in zip_ref.infolist():
+        if info.is_dir():
+            continue
+        folder = posixpath.dirname(info.filename)
+        if info.filename.endswith('.html') and 'My Activity' in folder and 'Google Pay' in folder:
+            return info.filename
+    return None
+
+
+def parse_google_pay_zip(zip_source, engine='stream', since=None, workers=1):
+    """Parse the Google Pay activity file inside a Takeout ZIP.
+
+    ``zip_source`` is the archive's bytes, a path or a binary file object.
+    The activity member is decompressed as a stream straight into the
+    parser; returns None when the archive has no such member.
+    """
+    if isinstance(zip_source, (bytes, bytearray, memoryview)):
+        zip_source = io.BytesIO(zip_source)
+    with zipfile.ZipFile(zip_source, 'r') as zip_ref:
+        with span('zip.find_activity'):
+            member = find_google_pay_activity(zip_ref)
+        if member is None:
+            return None
+        # Decompression streams into the parser, so it is timed as part of parse.*
+        with zip_ref.open(member) as f:
+            return parse_google_pay_html(f, engine=engine, since=since, workers=workers)
+
 
-    df_tx.to_csv(csv_file_path, index=False)
+def parse_google_pay_html_to_csv(html_file_path, csv_file_path, engine='stream', workers=1):
+    df_tx = _collect_transactions(html_file_path, engine, workers=workers)
+    with span('csv.write', rows=len(df_tx)):
+        df_tx.to_csv(csv_file_path, index=False)
 
     print(f"Converted HTML transactions to CSV at {csv_file_path}")
 
 if __name__ == '__main__':
     import sys
-    if len(sys.argv) < 3:
-        print("Usage: python html_to_csv.py input.html output.csv")
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    if len(args) < 2:
+        print("Usage: python html_to_csv.py input.html output.csv [--engine=stream|soup] [--workers=N]")
     else:
-        parse_google_pay_html_to_csv(sys.argv[1], sys.argv[2])
+        parse_google_pay_html_to_csv(args[0], args[1], engine=options.get('engine', 'stream'),
+                                     workers=int(options.get('workers', 1)))
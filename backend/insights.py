@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+# Payments to one merchant within ~10% of each other share an amount bucket
+AMOUNT_BUCKET_RATIO = 1.1
+MIN_PAYMENTS = 4
+# Largest std/mean of the gaps between payments that still counts as periodic
+MAX_GAP_CV = 0.25
+PERIODS = [('Weekly', 7), ('Fortnightly', 14), ('Monthly', 30.44), ('Quarterly', 91.31), ('Yearly', 365.25)]
+PERIOD_TOLERANCE = 0.15
+ANOMALY_WINDOW = 30
+ANOMALY_MIN_HISTORY = 10
+ANOMALY_Z = 3.0
+# Floor on the log-amount deviation, so near-constant categories (metro fares) don't divide by ~0
+MIN_LOG_STD = 0.05
+NS_PER_DAY = 86_400 * 10**9
+RECURRING_COLUMNS = ['Merchant', 'Typical Amount', 'Payments', 'Period', 'Interval (days)', 'Last Paid',
+                     'Next Expected', 'Active']
+
+
+def _sent_payments(df, key):
+    """Positions, ``key`` codes, timestamps and absolute amounts of dated Sent rows with a ``key``."""
+    codes, labels = pd.factorize(df[key])
+    values = pd.to_datetime(df['Raw Timestamp']).to_numpy(dtype='datetime64[ns]')
+    amount = np.abs(pd.to_numeric(df['Amount'], errors='coerce').to_numpy(dtype='float64'))
+    keep = (df['Type'] == 'Sent').to_numpy(dtype=bool) & (codes >= 0) & ~np.isnat(values) & (amount > 0)
+    positions = np.flatnonzero(keep)
+    return positions, codes[positions].astype('int64'), labels, values[positions], amount[positions]
+
+
+def _group_time_order(groups, values):
+    """Order sorting rows by non-negative int ``groups``, then by time.
+
+    Both are packed into one int64 key (time in whole seconds) when they
+    fit, so it is a single quicksort instead of a multi-pass lexsort.
+    """
+    if not len(values):
+        return np.arange(0)
+    seconds = (values - values.min()) // np.timedelta64(1, 's')
+    time_bits = int(seconds.max()).bit_length()
+    if int(groups.max()).bit_length() + time_bits < 63:
+        return np.argsort((groups << time_bits) | seconds)
+    return np.lexsort((values, groups))
+
+
+def _group_starts(groups):
+    """True where the (already sorted) ``groups`` changes value."""
+    starts = np.ones(len(groups), dtype=bool)
+    starts[1:] = groups[1:] != groups[:-1]
+    return starts
+
+
+def _period_labels(days):
+    """The named period within tolerance of each interval (in days), or None."""
+    matches = [np.abs(days - period) <= period * PERIOD_TOLERANCE for _, period in PERIODS]
+    return np.select(matches, [label for label, _ in PERIODS], default=None)
+
+
+def find_recurring(df, min_payments=MIN_PAYMENTS, max_gap_cv=MAX_GAP_CV):
+    """Merchants paid a similar amount at a regular interval.
+
+    Sent payments are grouped on (Merchant, amount bucket) and sorted by
+    time in one pass; a group is recurring when it has at least
+    ``min_payments`` payments and the gaps between them vary by at most
+    ``max_gap_cv`` of their mean, which must be close to one of
+    ``PERIODS``. Group statistics are ``reduceat`` sums over the sorted
+    arrays. Needs Raw Timestamp, Amount, Type and Merchant (see
+    ``backend.categorize``).
+    """
+    positions, merchant_codes, merchants, values, amount = _sent_payments(df, 'Merchant')
+    if not len(positions):
+        return pd.DataFrame(columns=RECURRING_COLUMNS)
+    buckets = np.floor(np.log(amount) / np.log(AMOUNT_BUCKET_RATIO)).astype('int64')
+    buckets -= buckets.min()
+    groups = merchant_codes * (buckets.max() + 1) + buckets
+
+    order = _group_time_order(groups, values)
+    merchant_codes, groups, values, amount = merchant_codes[order], groups[order], values[order], amount[order]
+    starts = _group_starts(groups)
+    gaps = np.diff(values.astype('int64'), prepend=0) / NS_PER_DAY
+    # Payments split or retried within a day count as one
+    counted = ~starts & (gaps >= 1)
+    gaps = np.where(counted, gaps, 0.0)
+
+    first = np.flatnonzero(starts)
+    sizes = np.diff(np.append(first, len(groups)))
+    n_gaps = np.add.reduceat(counted.astype('int64'), first)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gap_mean = np.add.reduceat(gaps, first) / n_gaps
+        gap_var = (np.add.reduceat(gaps ** 2, first) / n_gaps - gap_mean ** 2) * n_gaps / (n_gaps - 1)
+        periods = _period_labels(gap_mean)
+        regular = (n_gaps + 1 >= min_payments) & (np.sqrt(np.maximum(gap_var, 0)) <= max_gap_cv * gap_mean) & \
+            pd.notna(periods)
+    first, sizes, gap_mean, periods = first[regular], sizes[regular], gap_mean[regular], periods[regular]
+
+    # Only the (few) recurring groups need a median
+    group_ids = np.repeat(np.arange(len(first)), sizes)
+    members = np.repeat(first, sizes) + np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    typical = pd.Series(amount[members]).groupby(group_ids).median().to_numpy()
+
+    interval = pd.to_timedelta(gap_mean, unit='D').round('s')
+    last_paid = pd.DatetimeIndex(values[first + sizes - 1])
+    next_expected = last_paid + interval
+    recurring = pd.DataFrame({
+        'Merchant': np.asarray(merchants)[merchant_codes[first]],
+        'Typical Amount': typical.round(2),
+        'Payments': sizes,
+        'Period': periods,
+        'Interval (days)': gap_mean.round(1),
+        'Last Paid': last_paid,
+        'Next Expected': next_expected,
+        # Still active if the next payment isn't overdue by more than the tolerance
+        'Active': next_expected + interval * PERIOD_TOLERANCE >= values.max(),
+    }, columns=RECURRING_COLUMNS)
+    return recurring.sort_values(['Active', 'Typical Amount'], ascending=False, ignore_index=True)
+
+
+def category_zscores(df, window=ANOMALY_WINDOW, min_history=ANOMALY_MIN_HISTORY):
+    """Z-score of each Sent amount against the ``window`` previous ones in its Category.
+
+    Scores are on log amounts, so one large bill doesn't swamp a category
+    of small ones. Rows without ``min_history`` earlier payments in their
+    category (and non-Sent rows) get NaN. Returns a Series on ``df.index``.
+    """
+    positions, category_codes, _, values, amount = _sent_payments(df, 'Category')
+    order = _group_time_order(category_codes, values)
+    positions, category_codes, amount = positions[order], category_codes[order], np.log1p(amount[order])
+
+    # One rolling pass over all categories: ``window`` NaNs between them keep
+    # each window inside its own category, and min_periods skips the NaNs
+    slots = np.arange(len(amount)) + window * (np.cumsum(_group_starts(category_codes)) - 1)
+    padded = np.full(slots[-1] + 1 if len(slots) else 0, np.nan)
+    padded[slots] = amount
+    history = pd.Series(padded).rolling(window, min_periods=min_history, closed='left')
+    mean, std = history.mean().to_numpy()[slots], history.std().to_numpy()[slots]
+
+    z = (amount - mean) / np.maximum(std, MIN_LOG_STD)
+    scores = np.full(len(df), np.nan)
+    scores[positions] = z
+    return pd.Series(scores, index=df.index, name='Z-Score')
+
+
+def find_anomalies(df, threshold=ANOMALY_Z, window=ANOMALY_WINDOW, min_history=ANOMALY_MIN_HISTORY):
+    """Sent rows whose amount is ``threshold`` or more deviations above their category's recent spending."""
+    scores = category_zscores(df, window, min_history)
+    flagged = (scores >= threshold).to_numpy()
+    anomalies = df.loc[flagged, ['Raw Timestamp', 'Description', 'Merchant', 'Category', 'Amount']]
+    anomalies['Z-Score'] = scores[flagged].round(1)
+    return anomalies.sort_values('Raw Timestamp', ascending=False)
@@ -0,0 +1,175 @@
+import io
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+from auth.db import (
+    configure_pool, create_ingest_job, fail_interrupted_ingest_jobs, fail_stale_ingest_jobs, get_ingest_job,
+    get_pool, touch_ingest_jobs, update_ingest_job
+)
+from .cache import TransactionCache
+from .html_to_csv import find_google_pay_activity, parse_google_pay_html
+from .metrics import RECORDER, span
+from .store import load_transaction_store
+
+JOB_WORKERS = int(os.environ.get("INGEST_WORKERS", 2))
+STAGES = ['unzip', 'parse', 'enrich']
+# Parse progress is written about this many times per file
+PROGRESS_STEPS = 20
+# The owning process refreshes its jobs' updated_at this often; jobs left
+# unrefreshed for STALE_AFTER seconds are failed (their owner is gone)
+HEARTBEAT_SECONDS = 10
+STALE_AFTER = 6 * HEARTBEAT_SECONDS
+# Longest the app waits on one ingest job
+JOB_TIMEOUT = int(os.environ.get("INGEST_TIMEOUT", 30 * 60))
+
+
+def _boot_id():
+    try:
+        with open('/proc/sys/kernel/random/boot_id', encoding='ascii') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def process_owner(pid=None):
+    """'host:boot id:pid' of a server process, stored on the jobs it queues."""
+    return f"{socket.gethostname()}:{_boot_id()}:{os.getpid() if pid is None else pid}"
+
+
+def owner_alive(owner):
+    """Whether the process named by ``process_owner`` may still be running its jobs."""
+    host, boot_id, pid = owner.rsplit(':', 2)
+    if host != socket.gethostname():
+        # Another machine's process; nothing here can tell
+        return True
+    if boot_id != _boot_id():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class _ProgressReader(io.RawIOBase):
+    """Pass-through reader that reports the fraction of ``total`` bytes read."""
+
+    def __init__(self, raw, total, report):
+        self._raw = raw
+        self._total = max(total, 1)
+        self._report = report
+        self._read = 0
+        self._next_report = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._raw.readinto(buffer)
+        self._read += n
+        if self._read >= self._next_report:
+            self._report(min(self._read / self._total, 1.0))
+            self._next_report = self._read + self._total // PROGRESS_STEPS
+        return n
+
+
+def run_ingest_job(job_id, filepath, filename, content_hash, db_path):
+    """unzip -> parse -> enrich for one upload; runs in a worker process.
+
+    Results land in the ``TransactionCache`` and the columnar store keyed
+    by ``content_hash``, where the app's loaders pick them up. Returns the
+    spans recorded in this worker so the app can add them to its own
+    recorder.
+    """
+    configure_pool(db_path)
+    # Pool workers are reused; only this job's spans go back
+    RECORDER.clear()
+    try:
+        update_ingest_job(job_id, status='running', stage='unzip', progress=0.0)
+        with ExitStack() as stack:
+            if filename.lower().endswith('.zip'):
+                zip_ref = stack.enter_context(zipfile.ZipFile(filepath))
+                with span('zip.find_activity'):
+                    member = find_google_pay_activity(zip_ref)
+                if member is None:
+                    raise ValueError("Google Pay 'My Activity.html' not found in ZIP.")
+                raw = stack.enter_context(zip_ref.open(member))
+                total = zip_ref.getinfo(member).file_size
+            else:
+                raw = stack.enter_context(open(filepath, 'rb'))
+                total = os.path.getsize(filepath)
+
+            update_ingest_job(job_id, stage='parse', progress=0.0)
+            reader = _ProgressReader(raw, total, lambda fraction: update_ingest_job(job_id, progress=fraction))
+            df = parse_google_pay_html(io.BufferedReader(reader))
+
+        update_ingest_job(job_id, stage='enrich', progress=0.0)
+        with span('cache.write', rows=len(df)):
+            TransactionCache().put(content_hash, df)
+        with span('enrich.store', rows=len(df)):
+            load_transaction_store(content_hash, df)
+        update_ingest_job(job_id, status='done', progress=1.0)
+    except Exception as exc:
+        update_ingest_job(job_id, status='failed', error=str(exc))
+    return list(RECORDER.spans)
+
+
+class IngestQueue:
+    """Runs Google Pay uploads through ``run_ingest_job`` on a process pool.
+
+    Job state lives in the ``ingest_jobs`` table, so any script run can
+    poll a job by id. Submitting a content hash that is already queued or
+    running returns the existing job instead of parsing it twice. A
+    heartbeat thread keeps this queue's jobs fresh; jobs whose owner stops
+    heartbeating (on any host) are failed once stale, so nobody waits on
+    them forever.
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS):
+        # spawn: forking a process that already runs Streamlit's threads is unsafe
+        self._executor = ProcessPoolExecutor(max_workers=max_workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        # Only jobs of server processes that are gone; others share this database
+        fail_interrupted_ingest_jobs(owner_alive)
+        self._active = set()
+        self._stopped = threading.Event()
+        threading.Thread(target=self._heartbeat, name="ingest-heartbeat", daemon=True).start()
+
+    def _heartbeat(self):
+        while not self._stopped.wait(HEARTBEAT_SECONDS):
+            touch_ingest_jobs(list(self._active))
+
+    def submit(self, email, content_hash, filename, filepath):
+        # Frees the content hash if its active job's owner has gone quiet
+        fail_stale_ingest_jobs(STALE_AFTER)
+        job_id, created = create_ingest_job(email, content_hash, filename, filepath, process_owner())
+        if created:
+            self._active.add(job_id)
+            future = self._executor.submit(run_ingest_job, job_id, filepath, filename,
+                                           content_hash, get_pool().path)
+            future.add_done_callback(lambda f: self._on_done(job_id, f))
+        return job_id
+
+    def _on_done(self, job_id, future):
+        self._active.discard(job_id)
+        # run_ingest_job records its own errors; this catches a dead worker
+        if future.exception() is not None:
+            update_ingest_job(job_id, status='failed', error=str(future.exception()))
+        else:
+            RECORDER.extend(future.result())
+
+    def status(self, job_id):
+        fail_stale_ingest_jobs(STALE_AFTER)
+        return get_ingest_job(job_id)
+
+    def shutdown(self):
+        self._stopped.set()
+        self._executor.shutdown(wait=True)
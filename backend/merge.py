@@ -0,0 +1,80 @@
+import hashlib
+import os
+
+import pandas as pd
+
+from .analysis import combine_date_time
+
+MASTER_DIR = os.path.join("cache", "users")
+DEDUP_COLUMNS = ['Date', 'Time', 'Amount', 'Description']
+
+
+def merge_transactions(master, new):
+    """Union of two parsed exports, newest export first, without duplicates.
+
+    Uses the same Date/Time/Amount/Description key as
+    ``backend.html_to_csv`` does within a single file.
+    """
+    if master is None or master.empty:
+        return new.reset_index(drop=True)
+    merged = pd.concat([new, master], ignore_index=True)
+    return merged.drop_duplicates(subset=DEDUP_COLUMNS).reset_index(drop=True)
+
+
+class MasterTransactions:
+    """A user's merged transaction history across every Takeout they ingest.
+
+    Stored as one Parquet file per user. ``ingest`` only asks the parser
+    for entries at or after the newest transaction already stored, so the
+    cost of a new export is proportional to what is new in it.
+    """
+
+    def __init__(self, email, root=MASTER_DIR):
+        self.user_id = hashlib.md5(email.encode()).hexdigest()
+        user_dir = os.path.join(root, self.user_id)
+        self.path = os.path.join(user_dir, "transactions.parquet")
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        return pd.read_parquet(self.path)
+
+    def save(self, df):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def latest_timestamp(df):
+        if df is None or df.empty:
+            return None
+        latest = combine_date_time(df['Date'], df['Time']).max()
+        return None if pd.isna(latest) else latest
+
+    def revision(self, df):
+        """Cache key for this state of the history: the user plus a hash of its rows.
+
+        Both parts matter: the key names on-disk stores shared by every
+        account on the server.
+        """
+        content = pd.util.hash_pandas_object(df[DEDUP_COLUMNS], index=False).to_numpy()
+        return f"{self.user_id}-{hashlib.sha256(content.tobytes()).hexdigest()}"
+
+    def ingest(self, parse):
+        """Merge the entries ``parse(since)`` returns into the history.
+
+        ``parse`` is called with the newest stored timestamp (None for a
+        first ingest) and should return only entries at or after it, e.g.
+        ``lambda since: parse_google_pay_zip(data, since=since)``. Returns
+        ``(merged, added)``, or None if ``parse`` found nothing to parse.
+        """
+        master = self.load()
+        new = parse(self.latest_timestamp(master))
+        if new is None:
+            return None
+        merged = merge_transactions(master, new)
+        added = len(merged) - (0 if master is None else len(master))
+        if added or master is None:
+            self.save(merged)
+        return merged, added
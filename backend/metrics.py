@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+MAX_SPANS = 500
+METRIC_PREFIX = "finance_stage"
+
+
+class StageRecorder:
+    """Keeps the most recent timing spans of pipeline stages.
+
+    ``span(stage)`` records wall time, rows processed (if the caller sets
+    ``rows``) and, while memory tracing is on, the tracemalloc peak above
+    the memory in use when the span started. Tracing is process-wide and
+    slows allocation-heavy code, so it is off unless asked for.
+    """
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.spans = deque(maxlen=max_spans)
+        self._local = threading.local()
+
+    @property
+    def trace_memory(self):
+        return tracemalloc.is_tracing()
+
+    def set_trace_memory(self, enabled):
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _frames(self):
+        if not hasattr(self._local, 'frames'):
+            self._local.frames = []
+        return self._local.frames
+
+    @contextmanager
+    def span(self, stage, rows=None):
+        """Time the block as ``stage``; set ``record['rows']`` inside it if rows aren't known up front."""
+        record = {'stage': stage, 'rows': rows, 'seconds': None, 'peak_bytes': None, 'started_at': time.time()}
+        frames = self._frames()
+        frame = None
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if frames:
+                # reset_peak() below would hide the enclosing span's peak so far
+                frames[-1]['peak'] = max(frames[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame = {'base': current, 'peak': current}
+            frames.append(frame)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            if frame is not None and frames and frames[-1] is frame:
+                frames.pop()
+                if tracemalloc.is_tracing():
+                    frame['peak'] = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                    record['peak_bytes'] = frame['peak'] - frame['base']
+                if frames:
+                    frames[-1]['peak'] = max(frames[-1]['peak'], frame['peak'])
+            self.spans.append(record)
+
+    def summary(self):
+        """Per-stage totals over the recorded spans."""
+        stages = {}
+        for record in list(self.spans):
+            stats = stages.setdefault(record['stage'], {'runs': 0, 'seconds': 0.0, 'rows': 0, 'peak_bytes': None})
+            stats['runs'] += 1
+            stats['seconds'] += record['seconds']
+            stats['rows'] += record['rows'] or 0
+            if record['peak_bytes'] is not None:
+                stats['peak_bytes'] = max(stats['peak_bytes'] or 0, record['peak_bytes'])
+        return stages
+
+    def to_json(self):
+        return json.dumps({'stages': self.summary(), 'spans': list(self.spans)}, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition of ``summary()``."""
+        stages = self.summary()
+        lines = [
+            f"# HELP {METRIC_PREFIX}_duration_seconds Wall time spent in each pipeline stage.",
+            f"# TYPE {METRIC_PREFIX}_duration_seconds summary",
+        ]
+        for stage, stats in stages.items():
+            lines.append(f'{METRIC_PREFIX}_duration_seconds_sum{{stage="{stage}"}} {stats["seconds"]:.6f}')
+            lines.append(f'{METRIC_PREFIX}_duration_seconds_count{{stage="{stage}"}} {stats["runs"]}')
+        lines += [
+            f"# HELP {METRIC_PREFIX}_rows_total Rows processed by each pipeline stage.",
+            f"# TYPE {METRIC_PREFIX}_rows_total counter",
+        ]
+        lines += [f'{METRIC_PREFIX}_rows_total{{stage="{stage}"}} {stats["rows"]}' for stage, stats in stages.items()]
+        lines += [
+            f"# HELP {METRIC_PREFIX}_peak_memory_bytes Largest traced allocation peak seen in each stage.",
+            f"# TYPE {METRIC_PREFIX}_peak_memory_bytes gauge",
+        ]
+        lines += [f'{METRIC_PREFIX}_peak_memory_bytes{{stage="{stage}"}} {stats["peak_bytes"]}'
+                  for stage, stats in stages.items() if stats['peak_bytes'] is not None]
+        return '\n'.join(lines) + '\n'
+
+    def extend(self, records):
+        """Add spans recorded elsewhere, e.g. returned by an ingest worker process."""
+        self.spans.extend(records)
+
+    def clear(self):
+        self.spans.clear()
+
+
+RECORDER = StageRecorder()
+
+
+def span(stage, rows=None):
+    """``RECORDER.span``: the process-wide recorder the app's debug panel reads."""
+    return RECORDER.span(stage, rows)
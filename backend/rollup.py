@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+ROLLUP_COLUMNS = ['Sent', 'Received', 'Sent Count', 'Received Count', 'Sent Days']
+EMPTY_METRICS = {col: 0 for col in ROLLUP_COLUMNS}
+
+
+def _week_start(days):
+    # datetime64[D] counts from 1970-01-01, a Thursday; weeks start on Monday
+    offset = (days.astype('int64') + 3) % 7
+    return days - offset.astype('timedelta64[D]')
+
+
+class RollupIndex:
+    """Per-day/week/month Sent/Received totals plus a sorted timestamp index.
+
+    Built once per dataset. Metric lookups are a single index probe and row
+    slices use ``searchsorted`` on the sorted timestamps, so dashboard
+    widgets no longer rescan the whole frame.
+    """
+
+    def __init__(self, df):
+        values = pd.to_datetime(df['Raw Timestamp']).to_numpy(dtype='datetime64[ns]')
+        amount = pd.to_numeric(df['Amount'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+        tx_type = df['Type'].astype(str).to_numpy()
+        valid = ~np.isnat(values)
+
+        # NaT sorts last, so the first valid.sum() positions are the dated rows
+        order = np.argsort(values, kind='stable')[:int(valid.sum())]
+        self.order = order
+        self.sorted_ts = values[order]
+
+        days = values[valid].astype('datetime64[D]')
+        sent = tx_type[valid] == 'Sent'
+        received = tx_type[valid] == 'Received'
+        daily = pd.DataFrame({
+            'Sent': np.where(sent, amount[valid], 0.0),
+            'Received': np.where(received, amount[valid], 0.0),
+            'Sent Count': sent.astype('int64'),
+            'Received Count': received.astype('int64'),
+        }).groupby(days).sum()
+        daily['Sent Days'] = (daily['Sent Count'] > 0).astype('int64')
+
+        day_index = daily.index.to_numpy(dtype='datetime64[D]')
+        self.daily = daily
+        self.weekly = daily.groupby(_week_start(day_index)).sum()
+        self.monthly = daily.groupby(day_index.astype('datetime64[M]')).sum()
+
+    def rows_between(self, start, end):
+        """Row positions with ``start <= Raw Timestamp < end``, in frame order."""
+        lo, hi = np.searchsorted(self.sorted_ts, [np.datetime64(pd.Timestamp(start), 'ns'),
+                                                  np.datetime64(pd.Timestamp(end), 'ns')])
+        return np.sort(self.order[lo:hi])
+
+    def _metrics(self, table, key):
+        key = pd.Timestamp(key)
+        if key not in table.index:
+            return dict(EMPTY_METRICS)
+        return table.loc[key].to_dict()
+
+    def day_metrics(self, day):
+        return self._metrics(self.daily, day)
+
+    def week_metrics(self, week_start):
+        return self._metrics(self.weekly, week_start)
+
+    def month_metrics(self, month):
+        return self._metrics(self.monthly, month)
+
+    def months(self):
+        """Months with transactions as 'YYYY-MM' strings, newest first."""
+        return [m.strftime('%Y-%m') for m in self.monthly.index[::-1]]
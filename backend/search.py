@@ -0,0 +1,80 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+NGRAM = 3
+PAGE_SIZE = 100
+# Posting lists intersected per query; the substring check handles the rest
+MAX_INTERSECTIONS = 3
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class TransactionIndex:
+    """Search and amount-range index over a transaction frame.
+
+    Descriptions repeat heavily, so the trigram index is built over the
+    unique lowercased descriptions and maps each trigram to the ids of the
+    descriptions containing it. Amounts are kept sorted with their row
+    positions, so a range filter is two ``searchsorted`` probes.
+    """
+
+    def __init__(self, df):
+        descriptions = df['Description'].astype('category')
+        self.codes = descriptions.cat.codes.to_numpy()
+        self.texts = [str(d).lower() for d in descriptions.cat.categories]
+        postings = defaultdict(list)
+        for code, text in enumerate(self.texts):
+            for gram in _ngrams(text):
+                postings[gram].append(code)
+        self.postings = {gram: np.array(codes) for gram, codes in postings.items()}
+
+        amount = pd.to_numeric(df['Amount'], errors='coerce').to_numpy(dtype='float64')
+        order = np.argsort(amount, kind='stable')
+        # NaN sorts last; missing amounts never fall in a range
+        order = order[:int((~np.isnan(amount)).sum())]
+        self.amount_order = order
+        self.sorted_amounts = amount[order]
+
+    def amount_bounds(self):
+        if not len(self.sorted_amounts):
+            return 0.0, 0.0
+        return float(self.sorted_amounts[0]), float(self.sorted_amounts[-1])
+
+    def matching_descriptions(self, text):
+        """Ids of the descriptions containing ``text``, case-insensitively."""
+        text = text.lower()
+        candidates = range(len(self.texts))
+        if len(text) >= NGRAM:
+            lists = [self.postings.get(gram) for gram in _ngrams(text)]
+            if any(codes is None for codes in lists):
+                return np.array([], dtype='int64')
+            lists.sort(key=len)
+            candidates = lists[0]
+            for codes in lists[1:MAX_INTERSECTIONS]:
+                candidates = np.intersect1d(candidates, codes, assume_unique=True)
+        # Trigrams only narrow the candidates; confirm the full substring
+        return np.array([code for code in candidates if text in self.texts[code]], dtype='int64')
+
+    def search(self, text='', amount_range=None):
+        """Row positions matching ``text`` and ``amount_range`` (inclusive), in frame order."""
+        if amount_range is None:
+            rows = np.arange(len(self.codes))
+        else:
+            lo = np.searchsorted(self.sorted_amounts, amount_range[0], 'left')
+            hi = np.searchsorted(self.sorted_amounts, amount_range[1], 'right')
+            rows = np.sort(self.amount_order[lo:hi])
+        if text:
+            hit = np.zeros(len(self.texts) + 1, dtype=bool)
+            hit[self.matching_descriptions(text)] = True
+            # Missing descriptions have code -1, which lands on the spare False slot
+            rows = rows[hit[self.codes[rows]]]
+        return rows
+
+    def page(self, rows, page, page_size=PAGE_SIZE):
+        """Positions for 1-based ``page`` of ``rows``."""
+        start = (page - 1) * page_size
+        return rows[start:start + page_size]
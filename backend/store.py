@@ -0,0 +1,119 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .analysis import combine_date_time
+from .cache import TransactionCache
+
+STORE_DIR = os.path.join("cache", "stores")
+# Bump when the on-disk layout changes
+STORE_VERSION = 2
+
+
+def store_path(file_hash, root=STORE_DIR):
+    return os.path.join(root, f"{file_hash}-v{STORE_VERSION}")
+
+
+def _categorical(values):
+    cat = pd.Categorical(values)
+    return np.asarray(cat.codes), [str(c) for c in cat.categories]
+
+
+def _save_labels(labels, path, name):
+    """Save string labels as ``<name>_offsets.npy`` (int64) and ``<name>_bytes.npy`` (UTF-8)."""
+    encoded = [label.encode('utf-8') for label in labels]
+    offsets = np.zeros(len(encoded) + 1, dtype='int64')
+    np.cumsum([len(label) for label in encoded], out=offsets[1:])
+    np.save(os.path.join(path, f"{name}_offsets.npy"), offsets)
+    np.save(os.path.join(path, f"{name}_bytes.npy"), np.frombuffer(b''.join(encoded), dtype='uint8'))
+
+
+def _load_labels(path, name):
+    """Labels saved by ``_save_labels`` as a string Index over the memory-mapped files (no copy)."""
+    offsets = np.load(os.path.join(path, f"{name}_offsets.npy"), mmap_mode='r')
+    data = np.load(os.path.join(path, f"{name}_bytes.npy"), mmap_mode='r')
+    # np.save of an empty array leaves nothing to map; Arrow still wants a buffer
+    data_buffer = pa.py_buffer(data) if len(data) else pa.py_buffer(b'')
+    labels = pa.LargeStringArray.from_buffers(len(offsets) - 1, pa.py_buffer(offsets), data_buffer)
+    return pd.Index(pd.arrays.ArrowStringArray(pa.chunked_array([labels])))
+
+
+def write_transaction_store(df, path):
+    """Write parsed transactions as fixed-width columns under ``path``.
+
+    Layout: ``timestamp.npy`` (int64 ns since epoch, NaT as int64 min),
+    ``amount.npy`` (float64), ``type.npy`` / ``description.npy`` (category
+    codes), the description labels as ``description_offsets.npy`` plus
+    ``description_bytes.npy`` (one UTF-8 blob) and ``meta.json`` with the
+    row count and the few type labels.
+    """
+    if 'Raw Timestamp' in df.columns:
+        ts = pd.to_datetime(df['Raw Timestamp'], errors='coerce')
+    else:
+        ts = combine_date_time(df['Date'], df['Time'])
+    timestamp = ts.astype('datetime64[ns]').to_numpy().view('int64')
+    amount = pd.to_numeric(df['Amount'], errors='coerce').to_numpy(dtype='float64')
+    type_codes, type_labels = _categorical(df['Type'].astype(str).str.strip().str.capitalize())
+    desc_codes, desc_labels = _categorical(df['Description'])
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, "timestamp.npy"), timestamp)
+    np.save(os.path.join(tmp_path, "amount.npy"), amount)
+    np.save(os.path.join(tmp_path, "type.npy"), type_codes)
+    np.save(os.path.join(tmp_path, "description.npy"), desc_codes)
+    _save_labels(desc_labels, tmp_path, "description")
+    # Written last: its presence marks a complete store
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({'version': STORE_VERSION, 'rows': len(df), 'type': type_labels}, f)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Another session finished writing the same store first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def open_transaction_store(path):
+    """Open a store written by ``write_transaction_store`` as a DataFrame.
+
+    The numeric columns, category codes and description labels (an Arrow
+    string array over the offsets and bytes files) are read-only views
+    over ``np.load(mmap_mode='r')``, so every process that opens the same
+    store shares the OS page cache instead of holding its own copy.
+    Callers should add columns to a ``copy(deep=False)`` of the result.
+    """
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    timestamp = np.load(os.path.join(path, "timestamp.npy"), mmap_mode='r')
+    amount = np.load(os.path.join(path, "amount.npy"), mmap_mode='r')
+    type_codes = np.load(os.path.join(path, "type.npy"), mmap_mode='r')
+    desc_codes = np.load(os.path.join(path, "description.npy"), mmap_mode='r')
+
+    return pd.DataFrame({
+        'Raw Timestamp': pd.Series(timestamp.view('datetime64[ns]'), copy=False),
+        'Description': pd.Categorical.from_codes(desc_codes, categories=_load_labels(path, "description")),
+        'Amount': pd.Series(amount, copy=False),
+        'Type': pd.Categorical.from_codes(type_codes, categories=meta['type']),
+    }, copy=False)
+
+
+def load_transaction_store(file_hash, df=None, root=STORE_DIR, cache=None):
+    """Open the store for ``file_hash``, writing it from ``df`` first if needed.
+
+    Stores count against ``cache``'s (default ``TransactionCache()``) size
+    budget and are evicted with its least recently used entries. Returns
+    None when there is no store yet and no frame to build one from.
+    """
+    path = store_path(file_hash, root)
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        if df is None:
+            return None
+        os.makedirs(root, exist_ok=True)
+        write_transaction_store(df, path)
+    (cache or TransactionCache()).track(f"store/{os.path.basename(path)}", path)
+    return open_transaction_store(path)
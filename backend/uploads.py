@@ -0,0 +1,35 @@
+import hashlib
+import os
+
+UPLOAD_DIR = "uploads"
+
+
+def hash_upload(file_bytes):
+    """Content hash naming an upload's blob and the caches built from it (SHA-256, hex)."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def blob_path(content_hash, filename, root=UPLOAD_DIR):
+    """Where an upload with this content hash lives, e.g. uploads/blobs/ab/abcd....zip.
+
+    The original extension is kept so loaders can still dispatch on it.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    return os.path.join(root, "blobs", content_hash[:2], content_hash + ext)
+
+
+def store_upload(file_bytes, content_hash, filename, root=UPLOAD_DIR):
+    """Store upload bytes once per content hash and return the blob path.
+
+    Nothing is written when a blob with the same hash already exists, so
+    re-uploads and identical files from different users share one copy.
+    """
+    path = blob_path(content_hash, filename, root)
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(file_bytes)
+    os.replace(tmp_path, path)
+    return path
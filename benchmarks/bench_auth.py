@@ -0,0 +1,46 @@
+"""Login throughput through ``AuthService`` at several concurrency levels.
+
+Each simulated client logs in repeatedly against a scratch database.
+
+    python benchmarks/bench_auth.py [rounds]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import db
+from auth.auth import AUTH_WORKERS, AuthService
+
+LOGINS_PER_CLIENT = 8
+
+
+def main(rounds=10):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.configure_pool(os.path.join(tmpdir, "bench.db"))
+        db.migrate()
+        service = AuthService(rounds=rounds, max_pending=1024)
+        service.signup("bench@example.com", "hunter2")
+
+        print(f"bcrypt rounds: {rounds}, workers: {AUTH_WORKERS}")
+        for clients in (1, 2, 4, 8, 16):
+            def client(_):
+                for _ in range(LOGINS_PER_CLIENT):
+                    assert service.login("bench@example.com", "hunter2")
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                list(pool.map(client, range(clients)))
+            elapsed = time.perf_counter() - start
+            logins = clients * LOGINS_PER_CLIENT
+            print(f"concurrency {clients:3d}: {logins / elapsed:8.1f} logins/s")
+
+        service.shutdown()
+        db.get_pool().close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
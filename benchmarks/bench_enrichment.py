@@ -0,0 +1,55 @@
+"""Derived time columns: per-row Period lambdas vs ``add_time_columns``.
+
+    python benchmarks/bench_enrichment.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.analysis import add_time_columns
+
+
+def per_row_baseline(df):
+    ts = df['Raw Timestamp']
+    df['Hour'] = ts.dt.hour.fillna(0).astype(int)
+    df['Weekday'] = ts.dt.day_name()
+    df['Week'] = ts.dt.to_period('W').apply(lambda r: r.start_time.date())
+    df['Month'] = ts.dt.to_period('M').apply(lambda r: r.start_time.strftime('%Y-%m'))
+    df['AM/PM'] = ts.dt.strftime('%p').fillna('')
+    return df
+
+
+def main(rows=1_000_000):
+    rng = np.random.default_rng(0)
+    start = np.datetime64('2019-01-01T00:00:00', 's')
+    seconds = rng.integers(0, 6 * 365 * 86400, rows)
+    ts = pd.Series((start + seconds.astype('timedelta64[s]')).astype('datetime64[ns]'))
+
+    before = pd.DataFrame({'Raw Timestamp': ts})
+    t0 = time.perf_counter()
+    per_row_baseline(before)
+    t1 = time.perf_counter()
+    after = pd.DataFrame({'Raw Timestamp': ts})
+    add_time_columns(after, after['Raw Timestamp'])
+    t2 = time.perf_counter()
+
+    assert (before['Hour'] == after['Hour']).all()
+    assert (before['Weekday'] == after['Weekday'].astype(str)).all()
+    assert (pd.to_datetime(before['Week']) == after['Week']).all()
+    assert (before['Month'] == after['Month'].astype(str)).all()
+    assert (before['AM/PM'] == after['AM/PM'].astype(str)).all()
+
+    mem_before = before.drop(columns='Raw Timestamp').memory_usage(deep=True).sum()
+    mem_after = after.drop(columns='Raw Timestamp').memory_usage(deep=True).sum()
+    print(f"rows: {rows}")
+    print(f"per-row (Period.apply):  {t1 - t0:7.3f}s  {mem_before / 2**20:7.1f} MiB")
+    print(f"vectorized:              {t2 - t1:7.3f}s  {mem_after / 2**20:7.1f} MiB")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,64 @@
+"""Per-row cost of transaction field extraction, before and after batching.
+
+"Before" is the original per-row loop (regex + ``dateutil`` per cell),
+"after" is ``extract_transaction_fields`` over the whole batch. Both run on
+the cells of the same synthetic activity file.
+
+    python benchmarks/bench_extraction.py [rows]
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dateutil.parser import parse
+
+from backend.html_to_csv import extract_transaction_fields, iter_google_pay_cells
+from takeout import write_activity_file
+
+
+def per_row_baseline(descriptions, raw_timestamps):
+    records = []
+    for description, raw_timestamp in zip(descriptions, raw_timestamps):
+        try:
+            dt = parse(raw_timestamp.split(' GMT')[0])
+            date_str = dt.strftime('%Y-%m-%d')
+            time_str = dt.strftime('%I:%M:%S %p')
+        except Exception:
+            date_str = ''
+            time_str = ''
+        amount_match = re.search(r'[-+]?\d*\.?\d+', description.replace(',', ''))
+        amount = amount_match.group() if amount_match else '0'
+        tx_type = 'Sent' if 'paid' in description.lower() else 'Received'
+        records.append({'Date': date_str, 'Time': time_str, 'Description': description,
+                        'Amount': amount, 'Type': tx_type})
+    return records
+
+
+def main(rows=100_000):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'My Activity.html')
+        write_activity_file(path, rows)
+        cells = list(iter_google_pay_cells(path))
+
+    descriptions = [d for d, _ in cells]
+    raw_timestamps = [t for _, t in cells]
+
+    t0 = time.perf_counter()
+    before = per_row_baseline(descriptions, raw_timestamps)
+    t1 = time.perf_counter()
+    after = extract_transaction_fields(descriptions, raw_timestamps)
+    t2 = time.perf_counter()
+
+    assert after.to_dict('records') == before
+    n = len(cells)
+    print(f"rows: {n}")
+    print(f"per-row (dateutil + re):  {t1 - t0:7.3f}s  {(t1 - t0) / n * 1e6:6.2f} us/row")
+    print(f"batched (vectorized):     {t2 - t1:7.3f}s  {(t2 - t1) / n * 1e6:6.2f} us/row")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
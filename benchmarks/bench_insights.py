@@ -0,0 +1,60 @@
+"""Recurring-payment and anomaly detection on a large synthetic history.
+
+Builds an already-categorized frame (random spends plus a few monthly
+subscriptions) and times ``find_recurring`` and ``find_anomalies`` on it.
+
+    python benchmarks/bench_insights.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.insights import find_anomalies, find_recurring
+
+MERCHANTS = 5000
+CATEGORIES = ['Food', 'Transport', 'Groceries', 'Shopping', 'Bills', 'Health', 'Entertainment', 'Other']
+SUBSCRIPTIONS = {'Netflix': 649.0, 'Airtel Postpaid': 499.0, 'Sip Autopay': 5000.0}
+YEARS = 5
+
+
+def make_history(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    end = np.datetime64('2025-05-19T00:00:00', 's')
+    ts = end - rng.integers(0, YEARS * 365 * 86400, rows).astype('timedelta64[s]')
+    merchant_ids = rng.integers(0, MERCHANTS, rows)
+    df = pd.DataFrame({
+        'Raw Timestamp': ts.astype('datetime64[ns]'),
+        'Description': '',
+        'Merchant': pd.Categorical.from_codes(merchant_ids, [f"Merchant {i}" for i in range(MERCHANTS)]),
+        'Category': pd.Categorical.from_codes(merchant_ids % len(CATEGORIES), CATEGORIES),
+        'Amount': np.round(rng.lognormal(5, 1.2, rows), 2),
+        'Type': pd.Categorical.from_codes((rng.random(rows) < 0.3).astype('int8'), ['Sent', 'Received']),
+    })
+    months = np.arange(np.datetime64('2020-06', 'M'), np.datetime64('2025-05', 'M'))
+    subscriptions = pd.DataFrame([
+        {'Raw Timestamp': month.astype('datetime64[D]') + np.timedelta64(4, 'D'), 'Description': '',
+         'Merchant': name, 'Category': 'Bills', 'Amount': amount, 'Type': 'Sent'}
+        for name, amount in SUBSCRIPTIONS.items() for month in months
+    ])
+    return pd.concat([df, subscriptions], ignore_index=True)
+
+
+def main(rows=1_000_000):
+    df = make_history(rows)
+    print(f"rows: {len(df):,}")
+    for name, fn in [('find_recurring', find_recurring), ('find_anomalies', find_anomalies)]:
+        t0 = time.perf_counter()
+        result = fn(df)
+        print(f"{name:16} {time.perf_counter() - t0:7.3f}s  {len(result):,} rows")
+    recurring = find_recurring(df)
+    found = set(recurring.loc[recurring['Period'] == 'Monthly', 'Merchant'])
+    assert set(SUBSCRIPTIONS) <= found, f"missed subscriptions: {set(SUBSCRIPTIONS) - found}"
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
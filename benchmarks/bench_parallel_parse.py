@@ -0,0 +1,39 @@
+"""Scaling of ``parse_google_pay_html(workers=N)`` on a synthetic activity file.
+
+Every parallel run is checked against the serial parse before its time is
+reported. Speedups depend on the machine's core count.
+
+    python benchmarks/bench_parallel_parse.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.html_to_csv import parse_google_pay_html
+from takeout import write_activity_file
+
+WORKERS = [1, 2, 4, 8]
+
+
+def main(rows=200_000):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'My Activity.html')
+        write_activity_file(path, rows)
+        print(f"rows: {rows}  file: {os.path.getsize(path) / 2**20:.1f} MiB  cpus: {os.cpu_count()}")
+
+        serial = None
+        for workers in WORKERS:
+            t0 = time.perf_counter()
+            df = parse_google_pay_html(path, workers=workers)
+            elapsed = time.perf_counter() - t0
+            if serial is None:
+                serial, base = df, elapsed
+            assert df.equals(serial), f"workers={workers} differs from the serial parse"
+            print(f"workers={workers}:  {elapsed:7.3f}s  speedup {base / elapsed:4.2f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
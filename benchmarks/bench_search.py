@@ -0,0 +1,61 @@
+"""Transaction table filtering: full-frame ``str.contains`` vs ``TransactionIndex``.
+
+"Before" copies the frame and filters it per query, as the table tab used
+to on every keystroke; "after" probes the prebuilt index. Both must return
+the same rows.
+
+    python benchmarks/bench_search.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.search import TransactionIndex
+
+QUERIES = ['swiggy', 'merchant 12', 'bank account', 'zzz', 'paid ₹1']
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    amount = np.round(rng.uniform(1, 20000, rows), 2)
+    merchants = np.array([f"MERCHANT {i}" for i in range(500)] + ['SWIGGY', 'ZOMATO', 'UBER'])
+    payee = merchants[rng.integers(0, len(merchants), rows)]
+    description = [f"Paid ₹{a:,.2f} to {p} using Bank Account XXXXXX1234" for a, p in zip(amount, payee)]
+    return pd.DataFrame({'Description': pd.Categorical(description), 'Amount': amount})
+
+
+def baseline(df, text, amount_range):
+    filtered = df.copy()
+    if text:
+        filtered = filtered[filtered['Description'].str.contains(text, case=False, na=False, regex=False)]
+    filtered = filtered[(filtered['Amount'] >= amount_range[0]) & (filtered['Amount'] <= amount_range[1])]
+    return filtered.index.to_numpy()
+
+
+def main(rows=500_000):
+    df = make_frame(rows)
+    amount_range = (100, 5000)
+
+    t0 = time.perf_counter()
+    index = TransactionIndex(df)
+    build = time.perf_counter() - t0
+    print(f"rows: {rows}  unique descriptions: {len(index.texts)}  index build: {build:.2f}s")
+
+    for text in QUERIES:
+        t0 = time.perf_counter()
+        expected = baseline(df, text, amount_range)
+        t1 = time.perf_counter()
+        rows_found = index.search(text, amount_range)
+        t2 = time.perf_counter()
+        assert np.array_equal(rows_found, expected), text
+        print(f"{text!r:16} {len(rows_found):7} rows  str.contains {(t1 - t0) * 1e3:7.1f}ms  "
+              f"index {(t2 - t1) * 1e3:6.1f}ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,45 @@
+"""Import cost of the login page, measured with ``python -X importtime``.
+
+Runs ``import app`` (Streamlit's bare mode renders the logged-out page) in
+a fresh interpreter inside a scratch directory, several times, and reports
+the fastest run's total import time, the heaviest top-level imports and
+whether the heavy dependencies were loaded at all.
+
+    python benchmarks/bench_startup.py [runs]
+"""
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ['pandas', 'numpy', 'bs4', 'dateutil', 'pyarrow', 'google.generativeai']
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def measure():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, PYTHONPATH=REPO)
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                                cwd=tmpdir, env=env, capture_output=True, text=True)
+    imports = {}
+    for self_us, cumulative_us, indent, name in LINE.findall(result.stderr):
+        # Top-level imports are indented by a single space
+        imports[name] = (int(cumulative_us), len(indent) == 1)
+    return imports
+
+
+def main(runs=5):
+    best = min((measure() for _ in range(runs)),
+               key=lambda imports: sum(us for us, top in imports.values() if top))
+    top_level = sorted(((us, name) for name, (us, top) in best.items() if top), reverse=True)
+    print(f"login page imports: {sum(us for us, _ in top_level) / 1e3:8.1f} ms  (best of {runs})")
+    for us, name in top_level[:8]:
+        print(f"  {name:32} {us / 1e3:8.1f} ms")
+    for name in HEAVY:
+        print(f"  {name:32} {'loaded' if name in best else 'not loaded'}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
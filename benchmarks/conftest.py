@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from takeout import write_activity_file, write_takeout_zip
+
+# Comma-separated dataset sizes, e.g. BENCH_ROWS=10000,100000
+BENCH_ROWS = [int(n) for n in os.environ.get("BENCH_ROWS", "10000,50000").split(",")]
+
+
+@pytest.fixture(scope="session", params=BENCH_ROWS, ids=lambda rows: f"{rows}rows")
+def takeout(request, tmp_path_factory):
+    """A synthetic export of ``rows`` entries as both a ZIP and a bare HTML file."""
+    rows = request.param
+    root = tmp_path_factory.mktemp(f"takeout-{rows}")
+    zip_path, html_path = root / "takeout.zip", root / "My Activity.html"
+    write_takeout_zip(zip_path, rows)
+    write_activity_file(html_path, rows)
+    return {'rows': rows, 'zip': str(zip_path), 'html': str(html_path), 'root': root}
@@ -0,0 +1,87 @@
+"""Synthetic Google Pay Takeout exports for benchmarks.
+
+``write_activity_file`` emits ``My Activity.html`` in the same outer-cell /
+mdl-grid / content-cell layout as a real export, newest entry first;
+``write_takeout_zip`` wraps it in a Takeout-shaped archive.
+
+    python benchmarks/takeout.py out.zip [--rows=N] [--days=N] [--completed=0.95] [--seed=N]
+"""
+import random
+import string
+import sys
+import zipfile
+from datetime import datetime, timedelta
+
+ACTIVITY_MEMBER = "Takeout/Google Pay/My Activity/My Activity.html"
+HEADER = ('<html><head><title>My Activity History</title><meta charset="UTF-8"></head>'
+          '<body><div class="mdl-grid">')
+FOOTER = '</div></body></html>'
+CELL = (
+    '<div class="outer-cell mdl-cell mdl-cell--12-col mdl-shadow--2dp"><div class="mdl-grid">'
+    '<div class="header-cell mdl-cell mdl-cell--12-col"><p class="mdl-typography--title">Google Pay<br></p></div>'
+    '<div class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1">{description}<br>{timestamp}</div>'
+    '<div class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1 mdl-typography--text-right"></div>'
+    '<div class="content-cell mdl-cell mdl-cell--12-col mdl-typography--caption"><b>Products:</b><br>&emsp;Google Pay<br>'
+    '<b>Details:</b><br>&emsp;{reference}<br>&emsp;{status}<br></div></div></div>'
+)
+NOT_COMPLETED = ['Failed', 'Cancelled', 'Pending']
+MERCHANTS = 500
+
+
+def _description(rng):
+    amount = f"{rng.uniform(1, 20000):.2f}"
+    account = f"Bank Account XXXXXX{rng.choice(['1234', '5589', '2708'])}"
+    kind = rng.random()
+    # Roughly the mix of a real export
+    if kind < 0.52:
+        return f"Paid ₹{amount} to MERCHANT {rng.randrange(MERCHANTS)} using {account}"
+    if kind < 0.73:
+        return f"Sent ₹{amount} using {account}"
+    if kind < 0.90:
+        return f"Received ₹{amount}"
+    return f"Paid ₹{amount} using {account}"
+
+
+def _timestamp(ts):
+    # "May 9, 2025, 5:25:52 PM GMT+05:30": no zero padding on day or hour
+    return f"{ts:%b} {ts.day}, {ts:%Y}, {ts.hour % 12 or 12}:{ts:%M:%S %p} GMT+05:30"
+
+
+def activity_cells(rows, end=datetime(2025, 5, 19), days=5 * 365, completed=0.95, seed=0):
+    """Yield the HTML of ``rows`` entries spread over ``days`` up to ``end``, newest first."""
+    rng = random.Random(seed)
+    offsets = sorted((rng.randrange(days * 86400) for _ in range(rows)))
+    for offset in offsets:
+        status = 'Completed' if rng.random() < completed else rng.choice(NOT_COMPLETED)
+        reference = ''.join(rng.choices(string.ascii_letters + string.digits, k=16))
+        yield CELL.format(description=_description(rng), timestamp=_timestamp(end - timedelta(seconds=offset)),
+                          reference=reference, status=status)
+
+
+def write_activity_file(path, rows, seed=0, **options):
+    """Write a synthetic ``My Activity.html``; ``options`` go to ``activity_cells``."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HEADER)
+        f.writelines(activity_cells(rows, seed=seed, **options))
+        f.write(FOOTER)
+
+
+def write_takeout_zip(path, rows, seed=0, **options):
+    """Write a Takeout ZIP holding only the Google Pay activity file."""
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open(ACTIVITY_MEMBER, 'w') as member:
+            member.write(HEADER.encode())
+            for cell in activity_cells(rows, seed=seed, **options):
+                member.write(cell.encode())
+            member.write(FOOTER.encode())
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    opts = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    if not args:
+        print(__doc__)
+    else:
+        writer = write_takeout_zip if args[0].endswith('.zip') else write_activity_file
+        writer(args[0], int(opts.get('rows', 10_000)), seed=int(opts.get('seed', 0)),
+               days=int(opts.get('days', 5 * 365)), completed=float(opts.get('completed', 0.95)))
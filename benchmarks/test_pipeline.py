@@ -0,0 +1,99 @@
+"""pytest-benchmark suite over synthetic Takeout exports.
+
+Each benchmark records ``rows``, ``rows_per_s`` and ``peak_mib`` (peak
+traced allocation of one extra run, via tracemalloc) in its extra_info, so
+saved runs track throughput and memory alongside timings.
+
+    pip install pytest-benchmark
+    python -m pytest benchmarks --benchmark-autosave
+    BENCH_ROWS=200000 python -m pytest benchmarks -k parse_html
+"""
+import itertools
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from backend.analysis import add_time_columns, analyze_google_pay, combine_date_time, generate_summary
+from backend.categorize import Categorizer
+from backend.html_to_csv import parse_google_pay_html, parse_google_pay_zip
+from backend.insights import find_anomalies, find_recurring
+from backend.rollup import RollupIndex
+from backend.search import TransactionIndex
+from backend.store import open_transaction_store, write_transaction_store
+
+ROUNDS = 3
+
+
+def run(benchmark, fn, rows):
+    """Time ``fn``, then record throughput and peak memory for it."""
+    result = benchmark.pedantic(fn, rounds=ROUNDS, iterations=1, warmup_rounds=1)
+    if benchmark.disabled:
+        # --benchmark-disable: fn ran once as a plain test, there are no stats
+        return result
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info['rows'] = rows
+    benchmark.extra_info['rows_per_s'] = rows / benchmark.stats.stats.mean
+    benchmark.extra_info['peak_mib'] = peak / 2**20
+    return result
+
+
+@pytest.fixture(scope="session")
+def parsed(takeout):
+    return parse_google_pay_html(takeout['html'])
+
+
+def test_zip_extraction(benchmark, takeout):
+    df = run(benchmark, lambda: parse_google_pay_zip(takeout['zip']), takeout['rows'])
+    assert len(df)
+
+
+def test_parse_html(benchmark, takeout):
+    df = run(benchmark, lambda: parse_google_pay_html(takeout['html']), takeout['rows'])
+    assert len(df)
+
+
+def test_enrichment(benchmark, takeout, parsed):
+    """What the dashboard does to a parsed upload before drawing anything."""
+    store_ids = itertools.count()
+
+    def enrich():
+        path = takeout['root'] / f"store-{next(store_ids)}"
+        write_transaction_store(parsed, str(path))
+        df = open_transaction_store(str(path)).copy(deep=False)
+        add_time_columns(df, df['Raw Timestamp'])
+        RollupIndex(df)
+        TransactionIndex(df)
+        labels = Categorizer().categorize(df['Description'])
+        df['Merchant'] = labels['Merchant'].values
+        df['Category'] = labels['Category'].values
+        return df
+
+    df = run(benchmark, enrich, takeout['rows'])
+    assert len(df) == len(parsed)
+
+
+def test_analyze_google_pay(benchmark, takeout, parsed):
+    result = run(benchmark, lambda: analyze_google_pay(parsed.copy()), takeout['rows'])
+    assert result[0] == 'Google Pay'
+
+
+def test_generate_summary(benchmark, takeout, parsed):
+    summary = run(benchmark, lambda: generate_summary(parsed.copy()), takeout['rows'])
+    assert set(summary) == {'Date', 'Week', 'Month'}
+
+
+def test_insights(benchmark, takeout, parsed):
+    df = parsed.copy(deep=False)
+    df['Raw Timestamp'] = combine_date_time(df['Date'], df['Time'])
+    labels = Categorizer().categorize(df['Description'])
+    df['Merchant'] = labels['Merchant'].values
+    df['Category'] = labels['Category'].values
+    recurring, anomalies = run(benchmark, lambda: (find_recurring(df), find_anomalies(df)), takeout['rows'])
+    assert len(anomalies) < len(df)
@@ -0,0 +1,16 @@
+import pandas as pd
+
+from backend.analysis import add_time_columns, generate_summary
+
+
+def test_generate_summary_keeps_time_of_day_columns():
+    df = pd.DataFrame({
+        'Raw Timestamp': pd.to_datetime(['2025-05-09 17:25:52', '2025-05-12 09:00:00']),
+        'Amount': [10.0, 20.0],
+        'Type': ['Sent', 'Received'],
+    })
+    add_time_columns(df, df['Raw Timestamp'])
+    before = df[['Hour', 'AM/PM', 'Weekday']].copy()
+    summary = generate_summary(df)
+    pd.testing.assert_frame_equal(df[['Hour', 'AM/PM', 'Weekday']], before)
+    assert summary['Week']['Week'].dt.strftime('%Y-%m-%d').tolist() == ['2025-05-05', '2025-05-12']
@@ -0,0 +1,18 @@
+import pandas as pd
+
+from backend.categorize import OTHER, Categorizer
+
+
+def test_keywords_match_whole_words():
+    categorizer = Categorizer([('ola', 'Transport'), ('grocer*', 'Groceries'), ('sent ₹', 'Transfers')])
+    assert categorizer.resolve('Paid ₹100.00 to OLA CABS using Bank Account XXXX')[1] == 'Transport'
+    assert categorizer.resolve('Paid ₹100.00 to Motorola Store using Bank Account XXXX')[1] == OTHER
+    assert categorizer.resolve('Paid ₹100.00 to Cola Corner using Bank Account XXXX')[1] == OTHER
+    assert categorizer.resolve('Paid ₹100.00 to Fresh Grocery using Bank Account XXXX')[1] == 'Groceries'
+    assert categorizer.resolve('Sent ₹50.00')[1] == 'Transfers'
+
+
+def test_no_rules_leaves_everything_other():
+    labels = Categorizer([]).categorize(pd.Series(['Paid ₹100.00 to Swiggy using Bank Account XXXX', None]))
+    assert labels['Category'].tolist()[0] == OTHER
+    assert list(labels['Category'].cat.categories) == [OTHER]
@@ -0,0 +1,21 @@
+import warnings
+
+from backend.csv_ingest import read_bank_csv
+
+DAY_FIRST = (b'Date,Description,Debit,Credit,Balance\n'
+             b'25/01/2024,Rent,"1,000",,5000\n26/01/2024,Tea,10,,4990\n'
+             b'03/02/2024,Salary,,"20,000",24990\n04/02/2024,Tea,10,,24980\n')
+
+
+def test_bank_dates_read_the_same_in_any_chunking():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        whole = read_bank_csv(DAY_FIRST)
+        chunked = read_bank_csv(DAY_FIRST, chunksize=2)
+    assert whole['Date'].dt.strftime('%Y-%m-%d').tolist() == ['2024-01-25', '2024-01-26', '2024-02-03', '2024-02-04']
+    assert chunked['Date'].equals(whole['Date'])
+
+
+def test_missing_bank_description_is_searchable():
+    df = read_bank_csv(b'Date,Debit,Credit,Balance\n2024-01-05,1,,5\n')
+    assert not df['Description'].str.contains('x(', regex=False, na=False).any()
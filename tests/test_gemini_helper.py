@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+from google.api_core import exceptions
+
+from backend.gemini_helper import generate_gemini_summary, summarize_periods
+
+
+class FakeClient:
+    """Raises ``errors`` in turn, then answers every prompt."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "summary"
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'Raw Timestamp': pd.to_datetime(['2025-05-09 17:25:52', '2025-06-12 09:00:00']),
+        'Amount': [10.0, 20.0],
+        'Type': ['Sent', 'Received'],
+        'Description': ['Paid ₹10.00 to Cafe', 'Received ₹20.00 from Asha'],
+        'Month': ['2025-05', '2025-06'],
+    })
+
+
+@pytest.mark.parametrize('error', [exceptions.TooManyRequests('quota'), exceptions.ResourceExhausted('quota'),
+                                   exceptions.ServiceUnavailable('down'), exceptions.DeadlineExceeded('slow')])
+def test_transient_errors_are_retried(df, error):
+    client = FakeClient(error, error)
+    assert generate_gemini_summary(df, client=client, backoff=0) == "summary"
+    assert client.calls == 3
+
+
+@pytest.mark.parametrize('error', [exceptions.PermissionDenied('bad key'), exceptions.InvalidArgument('blocked'),
+                                   ValueError('bug')])
+def test_other_errors_are_not_retried(df, error):
+    client = FakeClient(error)
+    with pytest.raises(type(error)):
+        generate_gemini_summary(df, client=client, backoff=0)
+    assert client.calls == 1
+
+
+def test_retries_run_out(df):
+    client = FakeClient(*[exceptions.ServiceUnavailable('down')] * 3)
+    with pytest.raises(exceptions.ServiceUnavailable):
+        generate_gemini_summary(df, client=client, retries=2, backoff=0)
+    assert client.calls == 3
+
+
+def test_summarize_periods_keeps_failures_per_period(df):
+    client = FakeClient(exceptions.PermissionDenied('bad key'))
+    results = summarize_periods(df, client=client, max_workers=1, backoff=0)
+    assert isinstance(results['2025-05'], exceptions.PermissionDenied)
+    assert results['2025-06'] == "summary"
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from backend.html_to_csv import GRID_TAG, extract_transaction_fields, parse_google_pay_html
+from benchmarks.takeout import CELL, FOOTER, HEADER, activity_cells
+
+
+def _special_cells():
+    # Entities, self-closing <br/> and a wrapped description inside the content cell
+    yield CELL.format(description='Paid ₹1,250.00 to A &amp; B&nbsp;Stores using Bank Account XXXXXX1234',
+                      timestamp='May 9, 2025, 5:25:52 PM GMT+05:30', reference='ref1',
+                      status='Completed').replace('<br>', '<br/>')
+    yield CELL.format(description='Received ₹99.00<br>from &quot;Cafe&quot;',
+                      timestamp='May 8, 2025, 11:02:03 AM GMT+05:30', reference='ref2', status='Completed')
+    yield CELL.format(description='Paid ₹5.00 to Failed Shop', timestamp='May 7, 2025, 1:00:00 PM GMT+05:30',
+                      reference='ref3', status='Failed')
+
+
+@pytest.fixture
+def activity_html(tmp_path):
+    # HEADER opens the page-level mdl-grid that every outer cell is nested in
+    path = tmp_path / 'My Activity.html'
+    path.write_text(HEADER + ''.join(_special_cells()) + ''.join(activity_cells(300, completed=0.7)) + FOOTER,
+                    encoding='utf-8')
+    return path
+
+
+def test_fallback_timestamp_with_zone_keeps_wall_clock():
+    fields = extract_transaction_fields(
+        ['Paid ₹1.00 to X', 'Paid ₹2.00 to Y'],
+        ['May 9, 2025, 5:25:52 PM UTC', 'May 9, 2025, 5:25:52 PM GMT+05:30'],
+    )
+    assert fields['Date'].tolist() == ['2025-05-09', '2025-05-09']
+    assert fields['Time'].tolist() == ['05:25:52 PM', '05:25:52 PM']
+
+
+def test_stream_engine_matches_soup(activity_html):
+    stream = parse_google_pay_html(activity_html, engine='stream')
+    soup = parse_google_pay_html(activity_html, engine='soup')
+    pd.testing.assert_frame_equal(stream, soup)
+    assert 0 < len(stream) < 303
+    assert 'Failed Shop' not in ' '.join(stream['Description'])
+    assert stream['Description'].iloc[0] == 'Paid ₹1,250.00 to A & B\xa0Stores using Bank Account XXXXXX1234'
+    assert stream['Amount'].iloc[0] == 1250.0
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_parallel_parse_matches_serial(activity_html, workers):
+    serial = parse_google_pay_html(activity_html)
+    pd.testing.assert_frame_equal(parse_google_pay_html(activity_html, workers=workers), serial)
+
+
+def test_parallel_parse_without_grid_tag_matches_serial(activity_html):
+    # Same markup, but GRID_TAG never matches byte-for-byte, so there is nothing to split at
+    html = activity_html.read_text(encoding='utf-8').replace('<div class="mdl-grid">', "<div class='mdl-grid'>")
+    assert GRID_TAG.decode() not in html
+    activity_html.write_text(html, encoding='utf-8')
+    serial = parse_google_pay_html(activity_html)
+    assert len(serial)
+    pd.testing.assert_frame_equal(parse_google_pay_html(activity_html, workers=2), serial)